@@ -1,13 +1,26 @@
 import streamlit as st
 import pandas as pd
-import networkx as nx
-from pyvis.network import Network
 import plotly.graph_objects as go
 import numpy as np
-import tempfile
 import os
+import time
 from pathlib import Path
 
+from sir_engine import graph_to_csr, states_to_array, array_to_states, StateHistory, recording
+from sweep import parameter_grid, run_sweep
+from intervention import RANKING_METHODS, rank_nodes, containment_curve
+from influence import influence_maximization
+from result_store import ResultStore, graph_hash, result_key
+from network_view import (
+    network_html, network_view, neighborhood_view, state_signature,
+    MAX_RENDER_NODES, VIEW_STRATEGIES
+)
+from data_loader import DATA_DIR, load_network_adjacency, load_network_data, has_parquet_corpus, list_graph_ids
+from simulation import (
+    network_from_tables, sir_simulation_steps, run_sir_ensemble_simulation, plot_sir_curves,
+    ADAPTIVE_POLICIES, TRANSMISSION_MODES
+)
+
 # Page configuration
 st.set_page_config(
     page_title="InfoDemics - Misinformation Spread Simulator",
@@ -15,6 +28,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Built graphs shared by all sessions (each entry is one graph selection / removal setting)
+GRAPH_CACHE_ENTRIES = int(os.environ.get('INFODEMICS_GRAPH_CACHE_ENTRIES', 8))
+
 # Custom CSS for better styling
 st.markdown("""
 <style>
@@ -60,248 +76,52 @@ if 'sir_data' not in st.session_state:
 if 'selected_node' not in st.session_state:
     st.session_state.selected_node = None
 
-@st.cache_data
-def load_data():
-    """Load and preprocess the network data"""
+@st.cache_resource(max_entries=GRAPH_CACHE_ENTRIES)
+def load_data(graph_ids=None):
+    """Load and preprocess the network data (one read-only copy shared by all sessions)"""
     try:
-        # Load CSV files from data directory
-        nodes_df = pd.read_csv('../data/nodes.csv')
-        edges_df = pd.read_csv('../data/edges.csv')
-        
-        # Rename columns to match expected schema
-        nodes_df = nodes_df.rename(columns={
-            'followers': 'followers_count',
-            'friends': 'degree'
-        })
-        
-        # Classify nodes based on label
-        def classify_label(label):
-            if 'Non_Conspiracy' in str(label):
-                return 'Non-Conspiracy'
-            elif 'Conspiracy' in str(label):
-                return 'Conspiracy'
-            else:
-                return 'Non-Conspiracy'  # Treat "Other" as Susceptible
-        
-        nodes_df['category'] = nodes_df['label'].apply(classify_label)
-        
-        # Calculate actual degree from edges
-        degree_dict = {}
-        for node_id in nodes_df['id']:
-            degree = len(edges_df[edges_df['source'] == node_id]) + len(edges_df[edges_df['target'] == node_id])
-            degree_dict[node_id] = degree
-        
-        nodes_df['actual_degree'] = nodes_df['id'].map(degree_dict)
-        
-        return nodes_df, edges_df
+        return load_network_data(graph_ids=graph_ids)
     
     except FileNotFoundError as e:
-        st.error(f"Error: Could not find CSV files. Please ensure 'nodes.csv' and 'edges.csv' are in the same directory as app.py")
+        st.error(f"Error: Could not find CSV files. Please ensure 'nodes.csv' and 'edges.csv' are in {DATA_DIR}")
         st.stop()
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         st.stop()
 
-def create_network_graph(nodes_df, edges_df, remove_superspreaders=False, superspreader_pct=1):
-    """Create NetworkX graph from dataframes"""
-    G = nx.Graph()
-    
-    # Remove super-spreaders if requested
-    if remove_superspreaders:
-        threshold = np.percentile(nodes_df['actual_degree'], 100 - superspreader_pct)
-        nodes_df = nodes_df[nodes_df['actual_degree'] <= threshold].copy()
-        st.sidebar.info(f"🚫 Removed {len(nodes_df[nodes_df['actual_degree'] > threshold])} super-spreaders (top {superspreader_pct}%)")
-    
-    # Add nodes with attributes
-    for _, node in nodes_df.iterrows():
-        G.add_node(
-            node['id'],
-            label=node['category'],
-            followers_count=node['followers_count'],
-            degree=node['actual_degree'],
-            original_label=node['label']
-        )
-    
-    # Add edges
-    for _, edge in edges_df.iterrows():
-        if G.has_node(edge['source']) and G.has_node(edge['target']):
-            G.add_edge(edge['source'], edge['target'])
-    
-    return G, nodes_df
-
-def initialize_sir_states(G, initial_infected_pct):
-    """Initialize SIR states for all nodes"""
-    states = {}
-    nodes = list(G.nodes())
-    
-    # Get conspiracy nodes (already infected)
-    conspiracy_nodes = [n for n in nodes if G.nodes[n]['label'] == 'Conspiracy']
-    
-    # Calculate additional random infections if needed
-    total_infected = int(len(nodes) * initial_infected_pct / 100)
-    additional_infected = max(0, total_infected - len(conspiracy_nodes))
-    
-    # Get susceptible nodes for random infection
-    susceptible_nodes = [n for n in nodes if G.nodes[n]['label'] == 'Non-Conspiracy']
-    random_infected = np.random.choice(
-        susceptible_nodes, 
-        size=min(additional_infected, len(susceptible_nodes)), 
-        replace=False
-    ) if additional_infected > 0 else []
-    
-    # Set initial states
-    for node in nodes:
-        if node in conspiracy_nodes or node in random_infected:
-            states[node] = 'I'  # Infected
-        else:
-            states[node] = 'S'  # Susceptible
-    
-    return states
-
-def run_sir_simulation(G, beta, gamma, initial_infected_pct, time_steps=50):
-    """Run SIR model simulation"""
-    states = initialize_sir_states(G, initial_infected_pct)
-    
-    # Track counts over time
-    sir_history = {
-        'time': [],
-        'S': [],
-        'I': [],
-        'R': []
-    }
-    
-    for t in range(time_steps):
-        # Count current states
-        s_count = sum(1 for s in states.values() if s == 'S')
-        i_count = sum(1 for s in states.values() if s == 'I')
-        r_count = sum(1 for s in states.values() if s == 'R')
-        
-        sir_history['time'].append(t)
-        sir_history['S'].append(s_count)
-        sir_history['I'].append(i_count)
-        sir_history['R'].append(r_count)
-        
-        # Create new states for next iteration
-        new_states = states.copy()
-        
-        # Process infections (S -> I)
-        for node in G.nodes():
-            if states[node] == 'S':
-                # Check infected neighbors
-                infected_neighbors = [n for n in G.neighbors(node) if states[n] == 'I']
-                if infected_neighbors:
-                    # Probability of infection
-                    infection_prob = 1 - (1 - beta) ** len(infected_neighbors)
-                    if np.random.random() < infection_prob:
-                        new_states[node] = 'I'
-        
-        # Process recoveries (I -> R)
-        for node in G.nodes():
-            if states[node] == 'I':
-                if np.random.random() < gamma:
-                    new_states[node] = 'R'
-        
-        states = new_states
-    
-    return sir_history, states
+@st.cache_resource(max_entries=GRAPH_CACHE_ENTRIES, show_spinner="Building network graph...")
+def network_graph(graph_ids=None, remove_superspreaders=False, superspreader_pct=1):
+    """Build the frozen NetworkX graph once per process, returning (G, removed_count)"""
+    nodes_df, edges_df = load_data(graph_ids)
+    adjacency = load_network_adjacency(DATA_DIR, graph_ids)
+    return network_from_tables(nodes_df, edges_df, remove_superspreaders, superspreader_pct, adjacency)
 
-def create_pyvis_network(G, states=None):
-    """Create interactive PyVis network visualization"""
-    net = Network(height='600px', width='100%', bgcolor='#ffffff', font_color='black')
-    
-    # Configure physics
-    net.barnes_hut(gravity=-8000, central_gravity=0.3, spring_length=200, spring_strength=0.001)
-    
-    # Add nodes
-    for node in G.nodes():
-        node_data = G.nodes[node]
-        
-        # Determine color based on state or original label
-        if states:
-            state = states.get(node, 'S')
-            if state == 'I':
-                color = '#FF4B4B'  # Red for Infected
-            elif state == 'R':
-                color = '#4CAF50'  # Green for Recovered
-            else:
-                color = '#1E88E5'  # Blue for Susceptible
-        else:
-            color = '#FF4B4B' if node_data['label'] == 'Conspiracy' else '#1E88E5'
-        
-        # Size based on followers
-        size = 10 + (node_data['followers_count'] / 2)
-        
-        # Create title (tooltip)
-        title = f"ID: {node}<br>Category: {node_data['label']}<br>Followers: {node_data['followers_count']}<br>Degree: {node_data['degree']}"
-        
-        net.add_node(
-            node,
-            label=str(node),
-            color=color,
-            size=size,
-            title=title
-        )
-    
-    # Add edges
-    for edge in G.edges():
-        net.add_edge(edge[0], edge[1], color='#cccccc')
-    
-    return net
+def create_network_graph(graph_ids=None, remove_superspreaders=False, superspreader_pct=1):
+    """Create NetworkX graph for the selected graphs (from the shared cache)"""
+    G, removed_count = network_graph(graph_ids, remove_superspreaders, superspreader_pct)
+    if remove_superspreaders:
+        st.sidebar.info(f"🚫 Removed {removed_count} super-spreaders (top {superspreader_pct}%)")
+    return G
 
-def plot_sir_curves(sir_history):
-    """Create animated SIR curves using Plotly"""
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatter(
-        x=sir_history['time'],
-        y=sir_history['S'],
-        mode='lines+markers',
-        name='Susceptible',
-        line=dict(color='#1E88E5', width=3),
-        marker=dict(size=6)
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=sir_history['time'],
-        y=sir_history['I'],
-        mode='lines+markers',
-        name='Infected',
-        line=dict(color='#FF4B4B', width=3),
-        marker=dict(size=6)
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=sir_history['time'],
-        y=sir_history['R'],
-        mode='lines+markers',
-        name='Recovered',
-        line=dict(color='#4CAF50', width=3),
-        marker=dict(size=6)
-    ))
-    
-    fig.update_layout(
-        title='SIR Model: Misinformation Spread Over Time',
-        xaxis_title='Time Steps',
-        yaxis_title='Number of Nodes',
-        hovermode='x unified',
-        height=400,
-        template='plotly_white',
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
-    )
-    
-    return fig
+@st.cache_resource
+def result_store():
+    """Persistent result store shared by all sessions (and other server processes)"""
+    return ResultStore()
 
 # Sidebar controls
 st.sidebar.header("🎛️ Simulation Controls")
 
-# Load data
-nodes_df, edges_df = load_data()
+# Load data (pick graphs when a Parquet corpus is available)
+selected_graph_ids = None
+if has_parquet_corpus(DATA_DIR):
+    available_graph_ids = st.cache_data(list_graph_ids)(DATA_DIR)
+    selected_graph_ids = tuple(st.sidebar.multiselect(
+        "Graph IDs",
+        options=available_graph_ids,
+        default=available_graph_ids[:1],
+        help="Graphs to load from the Parquet corpus (only their row groups are read)"
+    )) or None
+nodes_df, edges_df = load_data(selected_graph_ids)
 
 # Display dataset info
 st.sidebar.markdown("### 📊 Dataset Info")
@@ -342,6 +162,62 @@ initial_infected_pct = st.sidebar.slider(
     help="Percentage of nodes initially infected"
 )
 
+model_type = st.sidebar.selectbox(
+    "Model",
+    options=['SIR', 'SEIR'],
+    format_func=lambda m: {'SIR': 'SIR (Susceptible-Infected-Recovered)',
+                           'SEIR': 'SEIR (adds an Exposed stage)'}[m],
+    help="SEIR runs a single undirected event-driven simulation without adaptive policies"
+)
+
+alpha = st.sidebar.slider(
+    "α (Exposed → Infected Rate)",
+    min_value=0.05,
+    max_value=1.0,
+    value=0.1,
+    step=0.05,
+    disabled=model_type != 'SEIR',
+    help="Probability of an exposed node starting to spread per step"
+)
+
+engine = st.sidebar.selectbox(
+    "Simulation Engine",
+    options=['frontier', 'discrete', 'event'],
+    format_func=lambda e: {'frontier': 'Discrete-time (active frontier)',
+                           'discrete': 'Discrete-time (full sparse step)',
+                           'event': 'Event-driven (continuous-time)'}[e],
+    disabled=model_type == 'SEIR',
+    help="Active-frontier and event-driven runs only touch infected nodes, so late or sparse outbreaks finish fastest"
+)
+
+random_seed = st.sidebar.number_input(
+    "Random Seed",
+    min_value=0,
+    value=42,
+    step=1,
+    help="Runs with the same seed and settings are reproducible (also across sweep workers)"
+)
+random_seed = int(random_seed)
+
+transmission = st.sidebar.selectbox(
+    "Transmission",
+    options=list(TRANSMISSION_MODES),
+    format_func=lambda t: TRANSMISSION_MODES[t],
+    disabled=model_type == 'SEIR',
+    help="Directed modes follow edges from source to target with a probability per edge "
+         "(full sparse step engine; the adaptive policy only applies to undirected runs)"
+)
+
+replicates = st.sidebar.slider(
+    "Monte Carlo Replicates",
+    min_value=1,
+    max_value=500,
+    value=1,
+    step=1,
+    disabled=model_type == 'SEIR',
+    help="Number of stochastic runs; more than one shows mean curves with 5-95% bands (discrete-time engine)"
+)
+
 st.sidebar.markdown("---")
 
 # Super-spreader intervention
@@ -351,25 +227,103 @@ remove_superspreaders = st.sidebar.checkbox(
     value=False,
     help="Remove the top 1% most connected nodes before simulation"
 )
+adaptive_policy = st.sidebar.selectbox(
+    "Adaptive Policy",
+    options=list(ADAPTIVE_POLICIES),
+    format_func=lambda p: ADAPTIVE_POLICIES[p],
+    disabled=model_type == 'SEIR',
+    help="Act on nodes at every step of a single run (quarantined or immunized nodes count as Recovered)"
+)
+policy_budget = st.sidebar.slider(
+    "Policy Budget (nodes per step)",
+    min_value=1,
+    max_value=500,
+    value=10,
+    disabled=adaptive_policy == 'none'
+)
+
+# SEIR only exists on the event-driven engine (undirected, single run)
+if model_type == 'SEIR':
+    engine, transmission, replicates, adaptive_policy = 'event', 'undirected', 1, 'none'
 
 st.sidebar.markdown("---")
 
-# Run simulation button
+# Network rendering (bounded level of detail)
+st.sidebar.markdown("### 🔍 Network View")
+view_strategy = st.sidebar.selectbox(
+    "Large-graph view",
+    options=list(VIEW_STRATEGIES),
+    format_func=lambda s: VIEW_STRATEGIES[s],
+    help="How graphs larger than the node budget are reduced before rendering"
+)
+max_render_nodes = st.sidebar.slider(
+    "Max rendered nodes",
+    min_value=50,
+    max_value=2000,
+    value=MAX_RENDER_NODES,
+    step=50
+)
+focus_node_text = st.sidebar.text_input(
+    "Drill into node ID",
+    value="",
+    help="Show only this node's neighborhood"
+)
+focus_radius = st.sidebar.slider("Neighborhood radius (hops)", 1, 3, 1)
+
+st.sidebar.markdown("---")
+
+# Run simulation button (clicking it again, or Stop, cancels a run in progress)
 run_simulation = st.sidebar.button("▶️ Run Simulation", type="primary")
+st.sidebar.button("⏹️ Stop Simulation", help="Cancel the running simulation and keep the steps computed so far")
 
+stream_run = False
 if run_simulation:
-    with st.spinner("Running SIR simulation..."):
-        # Create graph
-        G, filtered_nodes = create_network_graph(nodes_df, edges_df, remove_superspreaders)
-        
-        # Run simulation
-        sir_history, final_states = run_sir_simulation(G, beta, gamma, initial_infected_pct)
+    # Create graph
+    # Sessions keep only the cache key; the graph itself lives in the shared resource cache
+    st.session_state.graph_key = (selected_graph_ids, remove_superspreaders)
+    G = create_network_graph(selected_graph_ids, remove_superspreaders)
+    st.session_state.simulation_run = True
+    
+    # Identical graph, parameters and seed give identical results, so reuse stored ones
+    run_params = {
+        'beta': beta, 'gamma': gamma, 'initial_infected_pct': initial_infected_pct, 'time_steps': 50,
+        'replicates': replicates, 'engine': engine, 'transmission': transmission,
+        'policy': adaptive_policy, 'budget': policy_budget, 'model_type': model_type, 'alpha': alpha
+    }
+    run_key = result_key(graph_hash(G), run_params, random_seed)
+    st.session_state.run_key = (run_key, run_params)
+    stored = result_store().get(run_key)
+    
+    # Run simulation (batched ensemble now, single runs are streamed below)
+    st.session_state.state_history = None
+    if stored is not None:
+        st.session_state.sir_data = {name: values.tolist() for name, values in stored['history'].items()}
+        st.session_state.ensemble_stats = stored.get('stats')
+        st.session_state.final_states = array_to_states(stored['final_state'], list(G.nodes()))
+        if 'frames' in stored:
+            st.session_state.state_history = StateHistory.from_frames(stored['frames'], G.number_of_nodes())
+        st.sidebar.success("⚡ Loaded stored result for these settings")
+    elif replicates > 1:
+        with st.spinner("Running SIR simulation..."):
+            sir_history, ensemble_stats, final_states = run_sir_ensemble_simulation(
+                G, beta, gamma, initial_infected_pct, replicates,
+                transmission=transmission, edges_df=edges_df, seed=random_seed
+            )
         
         # Store in session state
-        st.session_state.simulation_run = True
         st.session_state.sir_data = sir_history
+        st.session_state.ensemble_stats = ensemble_stats
         st.session_state.final_states = final_states
-        st.session_state.G = G
+        result_store().put(run_key, run_params, {
+            'history': sir_history,
+            'stats': ensemble_stats,
+            'final_state': states_to_array(final_states, list(G.nodes()))
+        })
+    else:
+        stream_run = True
+        st.session_state.sir_data = {'time': [], 'S': [], 'I': [], 'R': []}
+        st.session_state.ensemble_stats = None
+        st.session_state.final_states = None
 
 # Main content area
 col1, col2 = st.columns([3, 2])
@@ -378,33 +332,99 @@ with col1:
     st.markdown("### 🕸️ Network Visualization")
     
     if st.session_state.simulation_run:
-        # Show network with final states
-        net = create_pyvis_network(st.session_state.G, st.session_state.final_states)
+        # Show network with final states, or any recorded step via the time scrubber
+        display_G, _ = network_graph(*st.session_state.graph_key)
+        display_states = st.session_state.final_states
+        history = st.session_state.get('state_history')
+        if display_states is not None and history is not None and len(history) > 1:
+            # Frames are the states at the start of each charted step (final_states is one update later)
+            scrub_step = st.slider("Network at time step", 0, len(history) - 1, len(history) - 1)
+            display_states = array_to_states(history.state_at(scrub_step), list(display_G.nodes()))
     else:
         # Show initial network
-        G, _ = create_network_graph(nodes_df, edges_df, remove_superspreaders)
-        net = create_pyvis_network(G)
+        display_G = create_network_graph(selected_graph_ids, remove_superspreaders)
+        display_states = None
     
-    # Save and display network
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.html', mode='w', encoding='utf-8') as f:
-        net.save_graph(f.name)
-        with open(f.name, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        st.components.v1.html(html_content, height=620, scrolling=False)
+    # Drill into one node's neighborhood, or render a bounded, pre-laid-out view
+    focus_node = None
+    if focus_node_text.strip():
+        try:
+            focus_node = int(focus_node_text.strip())
+        except ValueError:
+            focus_node = focus_node_text.strip()
+        if focus_node not in display_G:
+            st.warning(f"Node {focus_node_text} is not in the current network")
+            focus_node = None
+    
+    if focus_node is not None:
+        view_G = neighborhood_view(display_G, focus_node, focus_radius, max_render_nodes)
+        view_positions = None
+        st.caption(f"Neighborhood of node {focus_node} ({view_G.number_of_nodes()} nodes, {focus_radius} hop(s))")
+    else:
+        view_G, view_positions, view_description = network_view(display_G, max_render_nodes, view_strategy)
+        st.caption(view_description)
+    
+    # Render in memory; reruns that don't change the graph, settings or states reuse the HTML
+    html_key = (
+        graph_hash(display_G), remove_superspreaders,
+        focus_node, focus_radius if focus_node is not None else None, max_render_nodes, view_strategy,
+        state_signature(display_states)
+    )
+    html_content = network_html(html_key, view_G, display_states, view_positions)
+    st.components.v1.html(html_content, height=620, scrolling=False)
 
 with col2:
     st.markdown("### 📈 SIR Dynamics")
     
-    if st.session_state.simulation_run and st.session_state.sir_data:
+    if stream_run:
+        # Stream per-step snapshots; any rerun (Run/Stop/widget change) interrupts this loop
+        chart_slot = st.empty()
+        status_slot = st.empty()
+        steps, nodes = sir_simulation_steps(
+            G, beta, gamma, initial_infected_pct, engine=engine,
+            policy=adaptive_policy, budget=policy_budget,
+            transmission=transmission, edges_df=edges_df, seed=random_seed,
+            model_type=model_type, alpha=alpha
+        )
+        
+        # Record every step as 2-bit packed states for the time scrubber
+        st.session_state.state_history = StateHistory(len(nodes))
+        steps = recording(steps, st.session_state.state_history)
+        last_draw = 0.0
+        for snapshot, state in steps:
+            for key, value in snapshot.items():
+                st.session_state.sir_data.setdefault(key, []).append(value)
+            
+            # Redraw at most a few times per second
+            if time.monotonic() - last_draw > 0.25:
+                last_draw = time.monotonic()
+                chart_slot.plotly_chart(plot_sir_curves(st.session_state.sir_data), use_container_width=True)
+                status_slot.caption(f"⏳ Step {snapshot['time'] + 1}: " + ", ".join(
+                    f"{key}={value}" for key, value in snapshot.items() if key != 'time'
+                ))
+        
+        st.session_state.final_states = array_to_states(state, nodes)
+        run_key, run_params = st.session_state.run_key
+        result_store().put(run_key, run_params, {
+            'history': st.session_state.sir_data,
+            'final_state': state,
+            'frames': st.session_state.state_history.frames()
+        })
+        st.rerun()
+    
+    if st.session_state.simulation_run and st.session_state.sir_data and st.session_state.sir_data['time']:
+        if st.session_state.final_states is None:
+            st.warning(f"⏹️ Simulation stopped after {len(st.session_state.sir_data['time'])} steps")
+        
         # Plot SIR curves
         fig = plot_sir_curves(st.session_state.sir_data)
         st.plotly_chart(fig, use_container_width=True)
         
         # Show final statistics
         st.markdown("### 📊 Final Statistics")
-        final_s = st.session_state.sir_data['S'][-1]
-        final_i = st.session_state.sir_data['I'][-1]
-        final_r = st.session_state.sir_data['R'][-1]
+        final_s = round(st.session_state.sir_data['S'][-1], 1)
+        final_i = round(st.session_state.sir_data['I'][-1], 1)
+        final_r = round(st.session_state.sir_data['R'][-1], 1)
         
         col_a, col_b, col_c = st.columns(3)
         col_a.metric("Susceptible", final_s, delta=None)
@@ -412,9 +432,25 @@ with col2:
         col_c.metric("Recovered", final_r, delta=None)
         
         # Peak infection
-        peak_infected = max(st.session_state.sir_data['I'])
-        peak_time = st.session_state.sir_data['I'].index(peak_infected)
-        st.info(f"🔥 Peak Infection: {peak_infected} nodes at time step {peak_time}")
+        ensemble_stats = st.session_state.get('ensemble_stats')
+        if ensemble_stats:
+            peaks = ensemble_stats['peak_infected']
+            peak_times = ensemble_stats['peak_time']
+            st.info(
+                f"🔥 Peak Infection over {ensemble_stats['replicates']} runs: "
+                f"{peaks.mean():.1f} nodes on average "
+                f"(5-95%: {np.percentile(peaks, 5):.0f}-{np.percentile(peaks, 95):.0f}), "
+                f"median peak time step {np.median(peak_times):.0f} "
+                f"(5-95%: {np.percentile(peak_times, 5):.0f}-{np.percentile(peak_times, 95):.0f})"
+            )
+        else:
+            peak_infected = max(st.session_state.sir_data['I'])
+            peak_time = st.session_state.sir_data['I'].index(peak_infected)
+            st.info(f"🔥 Peak Infection: {peak_infected} nodes at time step {peak_time}")
+            if 'E' in st.session_state.sir_data:
+                st.info(f"🟠 Peak Exposed: {max(st.session_state.sir_data['E'])} nodes")
+            if 'controlled' in st.session_state.sir_data:
+                st.info(f"🛡️ Adaptive policy acted on {st.session_state.sir_data['controlled'][-1]} nodes")
         
         # Download results
         if st.button("💾 Download Simulation Data"):
@@ -435,6 +471,7 @@ with col2:
         - 🔴 **Red**: Conspiracy/Infected nodes
         - 🔵 **Blue**: Non-Conspiracy/Susceptible nodes
         - 🟢 **Green**: Recovered nodes (after simulation)
+        - 🟠 **Orange**: Exposed nodes (SEIR model)
         """)
         
         st.markdown("### ℹ️ How It Works")
@@ -445,6 +482,162 @@ with col2:
         4. **Analyze Results**: Compare different scenarios
         """)
 
+def plot_sweep_heatmap(results, betas, gammas, metric, title):
+    """Create a β × γ heatmap of one sweep metric using Plotly"""
+    grid = np.full((len(gammas), len(betas)), np.nan)
+    for (beta, gamma), result in results.items():
+        grid[gammas.index(gamma), betas.index(beta)] = result[metric]
+    
+    fig = go.Figure(go.Heatmap(
+        x=[f"{b:.2f}" for b in betas],
+        y=[f"{g:.2f}" for g in gammas],
+        z=grid,
+        colorscale='Reds',
+        colorbar=dict(title='Nodes' if metric != 'peak_time' else 'Step')
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title='β (Infection Rate)',
+        yaxis_title='γ (Recovery Rate)',
+        height=450,
+        template='plotly_white'
+    )
+    return fig
+
+# Parameter sweep
+st.markdown("---")
+with st.expander("🧪 Parameter Sweep (β × γ grid)"):
+    st.markdown("Run the whole grid in parallel and compare outcomes at a glance.")
+    
+    sweep_col1, sweep_col2, sweep_col3 = st.columns(3)
+    beta_range = sweep_col1.slider("β range", 0.0, 1.0, (0.05, 0.95), step=0.05)
+    gamma_range = sweep_col2.slider("γ range", 0.0, 1.0, (0.05, 0.95), step=0.05)
+    grid_size = sweep_col3.slider("Grid points per axis", 2, 40, 20)
+    
+    sweep_col4, sweep_col5, sweep_col6 = st.columns(3)
+    sweep_metric = sweep_col4.selectbox(
+        "Heatmap metric",
+        options=['final_size', 'peak_infected', 'peak_time'],
+        format_func=lambda m: {'final_size': 'Final size (ever infected)',
+                               'peak_infected': 'Peak infected',
+                               'peak_time': 'Peak time step'}[m]
+    )
+    sweep_replicates = sweep_col5.number_input("Replicates per point", 1, 200, 10)
+    compare_ban = sweep_col6.checkbox("Also sweep with Top 1% banned", value=False)
+    
+    if st.button("🚀 Run Sweep"):
+        betas = [round(b, 4) for b in np.linspace(*beta_range, grid_size)]
+        gammas = [round(g, 4) for g in np.linspace(*gamma_range, grid_size)]
+        remove_options = (False, True) if compare_ban else (False,)
+        grid = parameter_grid(betas, gammas, [initial_infected_pct], remove_options)
+        
+        G_sweep, _ = network_graph(selected_graph_ids)
+        results = {option: {} for option in remove_options}
+        progress = st.progress(0.0, text="Starting workers...")
+        heatmap_slots = {option: st.empty() for option in remove_options}
+        
+        # Results stream back as workers finish; redraw the heatmaps periodically
+        for done, (point, result) in enumerate(run_sweep(
+            G_sweep, grid, replicates=sweep_replicates, seed=random_seed, store=result_store()
+        ), start=1):
+            beta_p, gamma_p, _, removed = point
+            results[removed][(beta_p, gamma_p)] = result
+            progress.progress(done / len(grid), text=f"{done}/{len(grid)} runs complete")
+            if done % max(1, len(grid) // 10) == 0 or done == len(grid):
+                for option in remove_options:
+                    title = "Top 1% Banned" if option else "No Intervention"
+                    heatmap_slots[option].plotly_chart(
+                        plot_sweep_heatmap(results[option], betas, gammas, sweep_metric, title),
+                        use_container_width=True
+                    )
+
+def run_containment_analysis(G, methods, beta, gamma, initial_infected_pct, replicates, seed=None):
+    """Containment curve (0-10% removal) for each ranking method, on one shared CSR adjacency"""
+    adjacency, nodes = graph_to_csr(G)
+    labels = np.array([G.nodes[n]['label'] for n in nodes])
+    followers = np.array([G.nodes[n]['followers_count'] for n in nodes])
+    total_infected = int(len(nodes) * initial_infected_pct / 100)
+    
+    curves = {}
+    for method in methods:
+        order = rank_nodes(adjacency, method, followers=followers)
+        curves[method] = containment_curve(
+            adjacency, labels == 'Conspiracy', labels == 'Non-Conspiracy', total_infected,
+            beta, gamma, order, replicates=replicates, seed=seed
+        )
+    return curves
+
+def plot_containment_curves(curves):
+    """Create the final-size vs. removal-level chart using Plotly"""
+    fig = go.Figure()
+    for method, curve in curves.items():
+        fig.add_trace(go.Scatter(
+            x=curve['removed_pct'],
+            y=curve['final_size_pct'],
+            mode='lines+markers',
+            name=RANKING_METHODS[method]
+        ))
+    fig.update_layout(
+        xaxis_title='Nodes Removed (%)',
+        yaxis_title='Final Size (% of remaining nodes ever infected)',
+        hovermode='x unified',
+        height=450,
+        template='plotly_white'
+    )
+    return fig
+
+# Containment analysis
+with st.expander("🧯 Containment Curve (targeted removal 0–10%)"):
+    st.markdown("Remove the top-ranked nodes at increasing levels and compare how well each ranking contains the spread.")
+    
+    containment_col1, containment_col2 = st.columns(2)
+    containment_methods = containment_col1.multiselect(
+        "Rank nodes by",
+        options=list(RANKING_METHODS),
+        default=['degree', 'pagerank'],
+        format_func=lambda m: RANKING_METHODS[m]
+    )
+    containment_replicates = containment_col2.number_input("Replicates per level", 1, 200, 10)
+    
+    if st.button("📉 Compute Containment Curve") and containment_methods:
+        G_containment, _ = network_graph(selected_graph_ids)
+        with st.spinner("Simulating removal levels..."):
+            curves = run_containment_analysis(
+                G_containment, containment_methods, beta, gamma, initial_infected_pct, containment_replicates,
+                seed=random_seed
+            )
+        st.plotly_chart(plot_containment_curves(curves), use_container_width=True)
+        st.dataframe(
+            pd.concat({RANKING_METHODS[m]: c for m, c in curves.items()}, names=['Ranking']).reset_index(level=0),
+            hide_index=True
+        )
+
+def find_influential_accounts(G, k, beta, gamma, seed=None):
+    """Top-k seed accounts by expected SIR spread (RR-set sampling), as a DataFrame"""
+    adjacency, nodes = graph_to_csr(G)
+    seeds, spread = influence_maximization(adjacency, k, beta, gamma, seed=seed)
+    accounts = pd.DataFrame({
+        'Rank': np.arange(1, len(seeds) + 1),
+        'Node ID': [nodes[i] for i in seeds],
+        'Category': [G.nodes[nodes[i]]['label'] for i in seeds],
+        'Followers': [G.nodes[nodes[i]]['followers_count'] for i in seeds],
+        'Degree': [G.nodes[nodes[i]]['degree'] for i in seeds]
+    })
+    return accounts, spread
+
+# Influence maximization
+with st.expander("🎯 Most Influential Accounts"):
+    st.markdown("Find the k seed accounts with the largest expected spread for the current β and γ.")
+    
+    seed_count = st.slider("Number of seed accounts (k)", 1, 100, 10)
+    
+    if st.button("🔎 Find Influential Accounts"):
+        G_influence, _ = network_graph(selected_graph_ids)
+        with st.spinner("Sampling reverse-reachable sets..."):
+            accounts, spread = find_influential_accounts(G_influence, seed_count, beta, gamma, seed=random_seed)
+        st.metric("Expected Spread", f"{spread:.1f} nodes")
+        st.dataframe(accounts, hide_index=True)
+
 # Footer
 st.markdown("---")
 st.markdown("""
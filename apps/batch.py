@@ -0,0 +1,369 @@
+"""
+InfoDemics - Batch Runner
+Runs the scenarios of YAML/JSON job files on a worker pool and writes one Parquet results file
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import networkx as nx
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from sir_engine import (
+    ENSEMBLE_QUANTILES, attach_csr, initial_state_matrix, quantile_key, run_sir_ensemble, seed_sequence
+)
+from sweep import SharedGraph, init_worker, graph_view, point_seed
+from result_store import ResultStore, graph_hash, result_key
+from data_loader import DATA_DIR, load_network_adjacency, load_network_data, build_graph
+
+# Values used for anything a job or scenario leaves out. beta, gamma and time_steps match the
+# web app; it seeds the dataset's conspiracy share, a batch seeds 5% unless told otherwise
+SCENARIO_DEFAULTS = {
+    'beta': 0.3,
+    'gamma': 0.1,
+    'initial_infected_pct': 5.0,
+    'remove_superspreaders': False,
+    'superspreader_pct': 1.0,
+    'time_steps': 50,
+    'replicates': 10,
+    'seed': None,
+}
+SCENARIO_TYPES = {
+    'beta': float, 'gamma': float, 'initial_infected_pct': float, 'remove_superspreaders': bool,
+    'superspreader_pct': float, 'time_steps': int, 'replicates': int,
+}
+
+# Completed scenarios buffered before a Parquet row group is written
+ROW_GROUP_SCENARIOS = 256
+
+COMPARTMENTS = ('S', 'I', 'R')
+CURVE_COLUMNS = list(COMPARTMENTS) + [quantile_key(c, q) for c in COMPARTMENTS for q in ENSEMBLE_QUANTILES]
+
+PARAM_FIELDS = [
+    pa.field('scenario_id', pa.string()),
+    pa.field('job', pa.string()),
+    pa.field('beta', pa.float64()),
+    pa.field('gamma', pa.float64()),
+    pa.field('initial_infected_pct', pa.float64()),
+    pa.field('remove_superspreaders', pa.bool_()),
+    pa.field('superspreader_pct', pa.float64()),
+    pa.field('time_steps', pa.int32()),
+    pa.field('replicates', pa.int32()),
+    pa.field('seed', pa.int64()),
+    pa.field('nodes', pa.int64()),
+    pa.field('final_size', pa.float64()),
+    pa.field('peak_infected', pa.float64()),
+    pa.field('peak_time', pa.float64()),
+]
+SUMMARY_SCHEMA = pa.schema(PARAM_FIELDS)
+CURVE_SCHEMA = pa.schema(
+    PARAM_FIELDS + [pa.field('time', pa.int32())] + [pa.field(name, pa.float64()) for name in CURVE_COLUMNS]
+)
+
+
+def read_job(path):
+    """Parse one job file (.yaml/.yml or .json)"""
+    path = Path(path)
+    with open(path, encoding='utf-8') as f:
+        if path.suffix.lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Reading YAML job files requires PyYAML: pip install pyyaml")
+            job = yaml.safe_load(f)
+        else:
+            job = json.load(f)
+    if not isinstance(job, dict) or not job.get('scenarios'):
+        raise ValueError(f"{path}: a job needs a non-empty 'scenarios' list")
+    return job
+
+
+def expand_scenarios(job, name):
+    """Scenario dicts of a job, with defaults applied and list-valued fields expanded into their product
+
+    A scenario {'id': 'low', 'beta': [0.1, 0.2]} becomes 'low[0]' and
+    'low[1]'. Scenarios without an id are numbered in file order.
+    """
+    defaults = {**SCENARIO_DEFAULTS, **job.get('defaults', {})}
+    scenarios, seen = [], set()
+    for index, entry in enumerate(job['scenarios']):
+        entry = {**defaults, **entry}
+        unknown = set(entry) - set(SCENARIO_DEFAULTS) - {'id'}
+        if unknown:
+            raise ValueError(f"{name}: unknown scenario field(s) {sorted(unknown)}")
+
+        base_id = str(entry.pop('id', f"{name}-{index:05d}"))
+        varying = [field for field, value in entry.items() if isinstance(value, list)]
+        combinations = list(itertools.product(*(entry[field] for field in varying)))
+        for i, values in enumerate(combinations):
+            scenario = {**entry, **dict(zip(varying, values))}
+            scenario = {
+                field: (SCENARIO_TYPES[field](value) if field in SCENARIO_TYPES else value)
+                for field, value in scenario.items()
+            }
+            scenario['id'] = f"{base_id}[{i}]" if varying else base_id
+            scenario['job'] = name
+            if scenario['id'] in seen:
+                raise ValueError(f"{name}: duplicate scenario id '{scenario['id']}'")
+            seen.add(scenario['id'])
+            scenarios.append(scenario)
+    return scenarios
+
+
+def scenario_params(scenario):
+    """The fields that determine a scenario's result (everything but its id, job and seed)"""
+    return {field: scenario[field] for field in SCENARIO_DEFAULTS if field != 'seed'}
+
+
+def scenario_seed(scenario, job_seed):
+    """SeedSequence of a scenario: its own seed, or one derived from the job seed and its parameters"""
+    if scenario['seed'] is not None:
+        return seed_sequence(scenario['seed'])
+    return point_seed(job_seed, tuple(sorted(scenario_params(scenario).items())))
+
+
+def scenario_key(content_hash, scenario, job_seed):
+    """Result store key of one scenario (None when neither it nor its job is seeded)
+
+    The key holds the derived SeedSequence rather than the raw seed: a
+    scenario's own seed 5 and a job seed 5 give different streams.
+    """
+    if scenario['seed'] is None and job_seed is None:
+        return None
+    seed = scenario_seed(scenario, job_seed)
+    return result_key(
+        content_hash, {'kind': 'batch', **scenario_params(scenario)},
+        {'entropy': seed.entropy, 'spawn_key': list(seed.spawn_key)}
+    )
+
+
+def run_scenario(scenario, seed):
+    """Simulate one scenario inside a worker (on the graph attached by sweep.init_worker)"""
+    adjacency, seed_mask, candidate_mask = graph_view(
+        scenario['remove_superspreaders'], scenario['superspreader_pct']
+    )
+    n_nodes = adjacency.shape[0]
+
+    total_infected = int(n_nodes * scenario['initial_infected_pct'] / 100)
+    initial_states = initial_state_matrix(seed_mask, candidate_mask, total_infected, scenario['replicates'], seed)
+    sir_history, ensemble_stats, _ = run_sir_ensemble(
+        adjacency, initial_states, scenario['beta'], scenario['gamma'], scenario['time_steps'], seed=seed
+    )
+
+    return scenario['id'], {
+        'nodes': n_nodes,
+        'final_size': n_nodes - sir_history['S'][-1],
+        'peak_infected': float(ensemble_stats['peak_infected'].mean()),
+        'peak_time': float(np.median(ensemble_stats['peak_time'])),
+        'history': {name: np.asarray(sir_history[name], dtype=np.float64) for name in CURVE_COLUMNS},
+    }
+
+
+def load_job_graph(job, data_dir=None):
+    """Frozen graph of a job's data_dir / graph_ids selection"""
+    data_dir = job.get('data_dir') or data_dir or DATA_DIR
+    nodes_df, edges_df = load_network_data(data_dir, graph_ids=job.get('graph_ids'))
+    return nx.freeze(attach_csr(build_graph(nodes_df, edges_df), load_network_adjacency(data_dir, job.get('graph_ids'))))
+
+
+def run_job(G, scenarios, job_seed=None, max_workers=None, store=None):
+    """Run a job's scenarios on a process pool, yielding (scenario, result, from_store) as they finish
+
+    Works like sweep.run_sweep: the graph goes into shared memory once, each
+    scenario draws from its own stream, and with a ResultStore, stored
+    scenarios (seeded by themselves or by the job) are yielded first and
+    skipped.
+    """
+    by_id = {scenario['id']: scenario for scenario in scenarios}
+    keys = {}
+    pending = list(scenarios)
+    if store is not None:
+        content_hash = graph_hash(G)
+        keys = {scenario['id']: scenario_key(content_hash, scenario, job_seed) for scenario in scenarios}
+        keys = {scenario_id: key for scenario_id, key in keys.items() if key is not None}
+        stored = store.contains(keys.values())
+        pending = [scenario for scenario in scenarios if keys.get(scenario['id']) not in stored]
+        for scenario in scenarios:
+            if keys.get(scenario['id']) in stored:
+                yield scenario, store.get(keys[scenario['id']]), True
+    if not pending:
+        return
+
+    max_workers = max_workers or os.cpu_count()
+    with SharedGraph.from_graph(G) as shared:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(shared.spec,)) as pool:
+            futures = [
+                pool.submit(run_scenario, scenario, scenario_seed(scenario, job_seed))
+                for scenario in pending
+            ]
+            try:
+                for future in as_completed(futures):
+                    scenario_id, result = future.result()
+                    if scenario_id in keys:
+                        store.put(keys[scenario_id], {'kind': 'batch', 'scenario': scenario_id}, result)
+                    yield by_id[scenario_id], result, False
+            finally:
+                # Drop queued scenarios if the caller stops early
+                for future in futures:
+                    future.cancel()
+
+
+def result_columns(scenario, result, job_seed, summary=False):
+    """Column arrays of one scenario: one row, or one row per time step"""
+    seed = scenario['seed'] if scenario['seed'] is not None else job_seed
+    row = {
+        'scenario_id': scenario['id'], 'job': scenario['job'], **scenario_params(scenario), 'seed': seed,
+        'nodes': int(result['nodes']), 'final_size': float(result['final_size']),
+        'peak_infected': float(result['peak_infected']), 'peak_time': float(result['peak_time']),
+    }
+    if summary:
+        return {name: [value] for name, value in row.items()}
+
+    steps = len(result['history']['S'])
+    columns = {name: [value] * steps for name, value in row.items()}
+    columns['time'] = np.arange(steps)
+    columns.update({name: result['history'][name] for name in CURVE_COLUMNS})
+    return columns
+
+
+class ResultsWriter:
+    """Appends scenario results to one Parquet file, a row group per ROW_GROUP_SCENARIOS scenarios"""
+
+    def __init__(self, path, summary=False):
+        self.path = Path(path)
+        self.schema = SUMMARY_SCHEMA if summary else CURVE_SCHEMA
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = pq.ParquetWriter(self.path, self.schema, compression='zstd')
+        self._pending = []
+        self.rows = 0
+
+    def add(self, columns):
+        """Buffer one scenario's columns, flushing a row group when the buffer is full"""
+        self._pending.append(columns)
+        if len(self._pending) >= ROW_GROUP_SCENARIOS:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered scenarios as one row group"""
+        if not self._pending:
+            return
+        table = pa.table({
+            field.name: pa.array(
+                np.concatenate([np.asarray(columns[field.name]) for columns in self._pending]), type=field.type
+            )
+            for field in self.schema
+        }, schema=self.schema)
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+        self._pending = []
+
+    def close(self):
+        """Flush the remaining scenarios and finalize the file"""
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _format_duration(seconds):
+    """Compact h/m/s duration for progress lines"""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class Progress:
+    """Progress and throughput lines on stderr, at most one per `interval` seconds"""
+
+    def __init__(self, total, interval=2.0, quiet=False):
+        self.total = total
+        self.interval = interval
+        self.quiet = quiet
+        self.done = 0
+        self.stored = 0
+        self.start = time.perf_counter()
+        self._last = 0.0
+
+    def update(self, from_store=False):
+        """Count one finished scenario"""
+        self.done += 1
+        self.stored += from_store
+        now = time.perf_counter()
+        if now - self._last >= self.interval or self.done == self.total:
+            self._last = now
+            self.report(now)
+
+    def report(self, now=None):
+        """Print done/total, simulated runs per second and the estimated time left"""
+        if self.quiet:
+            return
+        elapsed = (now or time.perf_counter()) - self.start
+        simulated = self.done - self.stored
+        rate = simulated / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - self.done
+        eta = _format_duration(remaining / rate) if rate > 0 else '?'
+        print(
+            f"[{self.done}/{self.total}] {self.done / max(self.total, 1):6.1%} | "
+            f"{rate:.1f} runs/s | {self.stored} from store | elapsed {_format_duration(elapsed)} | ETA {eta}",
+            file=sys.stderr, flush=True
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run InfoDemics scenario batches from YAML/JSON job files")
+    parser.add_argument("jobs", nargs='+', help="Job files (.yaml/.yml/.json)")
+    parser.add_argument("-o", "--output", default="batch_results.parquet", help="Parquet file to write")
+    parser.add_argument("--data-dir", help="Default data directory for jobs that do not set data_dir")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for jobs that do not set one")
+    parser.add_argument("--summary", action="store_true", help="One row per scenario instead of one per time step")
+    parser.add_argument("--no-store", action="store_true", help="Do not read or write the shared result store")
+    parser.add_argument("--quiet", action="store_true", help="No progress lines")
+    args = parser.parse_args(argv)
+
+    # Validate every job before any simulation starts
+    jobs = []
+    for path in args.jobs:
+        job = read_job(path)
+        name = job.get('name', Path(path).stem)
+        jobs.append((job, name, expand_scenarios(job, name)))
+    total = sum(len(scenarios) for _, _, scenarios in jobs)
+    store = None if args.no_store else ResultStore()
+
+    progress = Progress(total, quiet=args.quiet)
+    with ResultsWriter(args.output, summary=args.summary) as writer:
+        for job, name, scenarios in jobs:
+            job_seed = job.get('seed', args.seed)
+            G = load_job_graph(job, args.data_dir)
+            if not args.quiet:
+                print(f"{name}: {len(scenarios)} scenarios on {G.number_of_nodes()} nodes, "
+                      f"{G.number_of_edges()} edges (seed={job_seed})", file=sys.stderr, flush=True)
+            for scenario, result, from_store in run_job(G, scenarios, job_seed, args.workers, store):
+                writer.add(result_columns(scenario, result, job_seed, args.summary))
+                progress.update(from_store)
+
+    if not args.quiet:
+        elapsed = time.perf_counter() - progress.start
+        print(f"Wrote {writer.rows} rows for {total} scenarios to {args.output} "
+              f"in {_format_duration(elapsed)} ({total / max(elapsed, 1e-9):.1f} scenarios/s)",
+              file=sys.stderr, flush=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
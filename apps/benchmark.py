@@ -0,0 +1,238 @@
+"""
+InfoDemics - Benchmark Harness
+Times each app stage and records its peak memory on data/ and on larger synthetic graphs fitted to it
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATA_DIR, load_network_adjacency, load_network_data
+from graph_cache import CACHE_DIR, source_hash
+from graph_generator import generate_graph, profile_from_data
+from network_view import MAX_RENDER_NODES, build_view, render_html
+from simulation import initialize_sir_states, network_from_tables, plot_sir_curves, run_sir_simulation
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+BENCH_DIR = PROJECT_DIR / 'benchmarks'
+HISTORY_FILE = BENCH_DIR / 'history.jsonl'
+BASELINE_FILE = BENCH_DIR / 'baseline.json'
+SYNTHETIC_DIR = PROJECT_DIR / '.cache' / 'bench'
+
+# Simulation settings of every run (the app's defaults)
+BETA, GAMMA, INITIAL_INFECTED_PCT, TIME_STEPS, SEED = 0.3, 0.1, 5, 50, 42
+
+# A stage regresses when it is this much slower (or bigger) than the baseline ...
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.25
+# ... and the difference is above the timer's noise floor
+MIN_TIME_DELTA = 0.02
+
+
+def synthetic_data_dir(n_nodes, seed=0):
+    """Directory with nodes.csv/edges.csv of a graph_generator graph fitted to data/, generated on first use"""
+    path = SYNTHETIC_DIR / f"synthetic-{n_nodes}-{seed}"
+    if not (path / 'edges.csv').exists():
+        partial = path.with_name(path.name + '.tmp')
+        shutil.rmtree(partial, ignore_errors=True)
+        shutil.rmtree(path, ignore_errors=True)
+        generate_graph(profile_from_data(DATA_DIR, seed), n_nodes, partial, seed=seed)
+        os.replace(partial, path)
+    return path
+
+
+def measure(function, repeat=1, memory=True, setup=None):
+    """Run function `repeat` times, returning (last result, seconds per run, peak traced bytes or None)
+
+    setup, when given, runs untimed before every run (including the memory run).
+    """
+    seconds = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        seconds.append(time.perf_counter() - start)
+
+    # Tracing slows allocation-heavy code down, so memory gets its own run
+    peak = None
+    if memory:
+        del result
+        if setup is not None:
+            setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, seconds, peak
+
+
+def benchmark_dataset(data_dir, repeat=1, memory=True):
+    """Measure every stage on one dataset, returning one record per stage
+
+    Stages call the same functions as the app; the two rendering stages are
+    what its cached network_view and network_html compute on a miss. Loading
+    is timed twice: cold (CSV parse plus binary graph cache build, as on a
+    first start) and warm (memory-mapped from the cache).
+    """
+    timings = {}
+
+    def stage(name, function, setup=None):
+        result, seconds, peak = measure(function, repeat, memory, setup)
+        timings[name] = (seconds, peak)
+        return result
+
+    def clear_graph_cache():
+        shutil.rmtree(CACHE_DIR / source_hash(data_dir), ignore_errors=True)
+
+    stage('load_data_cold', lambda: load_network_data(data_dir), setup=clear_graph_cache)
+    nodes_df, edges_df = stage('load_data_warm', lambda: load_network_data(data_dir))
+    adjacency = load_network_adjacency(data_dir)
+    G, _ = stage('create_network_graph', lambda: network_from_tables(nodes_df, edges_df, adjacency=adjacency))
+    stage('initialize_sir_states', lambda: initialize_sir_states(G, INITIAL_INFECTED_PCT, SEED))
+    sir_history, final_states = stage('run_sir_simulation', lambda: run_sir_simulation(
+        G, BETA, GAMMA, INITIAL_INFECTED_PCT, TIME_STEPS, seed=SEED
+    ))
+    view_G, positions, _ = stage('build_view', lambda: build_view(G, MAX_RENDER_NODES, 'degree'))
+    stage('render_html', lambda: render_html(view_G, final_states, positions))
+    stage('plot_sir_curves', lambda: plot_sir_curves(sir_history).to_json())
+
+    return [
+        {
+            'stage': name, 'nodes': G.number_of_nodes(), 'edges': G.number_of_edges(),
+            'seconds': float(np.median(seconds)), 'min_seconds': float(min(seconds)), 'peak_bytes': peak,
+        }
+        for name, (seconds, peak) in timings.items()
+    ]
+
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes=(1000, 10_000, 100_000), include_data=True, repeat=3, memory=True, seed=0, log=print):
+    """Benchmark data/ and a synthetic graph per size, returning one history record"""
+    datasets = ([('data', DATA_DIR)] if include_data else []) + [
+        (f"synthetic-{n}", None) for n in sizes
+    ]
+
+    results = []
+    for name, data_dir in datasets:
+        if data_dir is None:
+            log(f"{name}: generating...")
+            data_dir = synthetic_data_dir(int(name.rsplit('-', 1)[1]), seed)
+        for record in benchmark_dataset(data_dir, repeat, memory):
+            results.append({'dataset': name, **record})
+            log(f"{name:>20} {record['stage']:<22} {record['seconds'] * 1000:10.1f} ms"
+                + (f" {record['peak_bytes'] / 2**20:9.1f} MiB" if record['peak_bytes'] is not None else ""))
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def append_history(run, path=HISTORY_FILE):
+    """Append one run to the JSON-lines history"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run) + '\n')
+
+
+def compare(run, baseline, time_tolerance=TIME_TOLERANCE, memory_tolerance=MEMORY_TOLERANCE):
+    """Per-stage comparison against a baseline run, as a DataFrame with a 'regression' column"""
+    base = {(r['dataset'], r['stage']): r for r in baseline['results']}
+    rows = []
+    for record in run['results']:
+        reference = base.get((record['dataset'], record['stage']))
+        if reference is None:
+            continue
+        time_ratio = record['seconds'] / max(reference['seconds'], 1e-9)
+        slower = (time_ratio > 1 + time_tolerance
+                  and record['seconds'] - reference['seconds'] > MIN_TIME_DELTA)
+        memory_ratio = None
+        bigger = False
+        if record['peak_bytes'] is not None and reference.get('peak_bytes'):
+            memory_ratio = record['peak_bytes'] / reference['peak_bytes']
+            bigger = memory_ratio > 1 + memory_tolerance
+        rows.append({
+            'dataset': record['dataset'], 'stage': record['stage'],
+            'baseline_ms': reference['seconds'] * 1000, 'ms': record['seconds'] * 1000, 'time_ratio': time_ratio,
+            'memory_ratio': memory_ratio, 'regression': slower or bigger,
+        })
+    return pd.DataFrame(rows)
+
+
+def _parse_sizes(text):
+    """'1e3,1e4' -> [1000, 10000]"""
+    return [int(float(size)) for size in text.split(',') if size.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the InfoDemics app stages")
+    parser.add_argument("--sizes", type=_parse_sizes, default=[1000, 10_000, 100_000],
+                        help="Synthetic graph sizes, e.g. 1e3,1e4,1e5,1e6,1e7 (default: 1e3,1e4,1e5; "
+                             "the NetworkX and PyVis stages need several GB from 1e6 nodes)")
+    parser.add_argument("--no-data", action="store_true", help="Skip the bundled data/ set")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (median is recorded)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced peak-memory run")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic graphs")
+    parser.add_argument("--history", default=str(HISTORY_FILE), help="JSON-lines history to append to")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE), help="Baseline run to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Make this run the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    run = run_benchmarks(args.sizes, not args.no_data, args.repeat, not args.no_memory, args.seed)
+    append_history(run, args.history)
+    print(f"\nAppended run to {args.history}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline or not baseline_path.exists():
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(run, indent=1), encoding='utf-8')
+        print(f"Saved baseline to {baseline_path}")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    comparison = compare(run, baseline, args.time_tolerance, args.memory_tolerance)
+    print(f"\nCompared with baseline {baseline.get('commit')} ({baseline.get('timestamp')}):")
+    print(comparison.to_string(index=False, float_format=lambda x: f"{x:.2f}") if len(comparison) else "  no common stages")
+    regressions = comparison[comparison['regression']] if len(comparison) else comparison
+    if len(regressions):
+        print(f"\n{len(regressions)} stage(s) regressed")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
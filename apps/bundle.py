@@ -0,0 +1,193 @@
+"""
+InfoDemics - Front-End Bundle
+Builds the compact, content-addressed graph bundle that InfoDemics.html loads instead of the CSVs
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import networkx as nx
+
+from data_loader import DATA_DIR
+from graph_cache import open_graph_cache
+from network_view import LAYOUT_SCALE
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bump when the binary layout changes (InfoDemics.html checks it)
+BUNDLE_VERSION = 2
+BUNDLE_MAGIC = b'IDMB'
+BUNDLE_DIR = DATA_DIR / 'bundle'
+MANIFEST_NAME = 'graph.json'
+
+# Category codes stored per node
+CATEGORIES = ('Non-Conspiracy', 'Conspiracy')
+
+# Full-graph layouts beyond this size take minutes in spring_layout
+MAX_LAYOUT_NODES = 20_000
+
+
+def _index_dtype(max_value):
+    """Smallest little-endian integer dtype that JS typed arrays can hold max_value in"""
+    if max_value < 2 ** 8:
+        return np.dtype('<u1')
+    if max_value < 2 ** 16:
+        return np.dtype('<u2')
+    if max_value < 2 ** 32:
+        return np.dtype('<u4')
+    if max_value < 2 ** 53:
+        # Float64Array holds integers exactly up to 2^53
+        return np.dtype('<f8')
+    raise ValueError(f"Value {max_value} is too large for a browser typed array")
+
+
+def _compact(array):
+    """Integer array in the smallest typed-array dtype (non-negative values only)"""
+    array = np.asarray(array)
+    if len(array) and array.min() < 0:
+        raise ValueError("Bundle arrays must be non-negative")
+    return array.astype(_index_dtype(int(array.max(initial=0))))
+
+
+def _id_columns(node_ids):
+    """node_ids as one compact column, or as u4 low/high halves when ids reach 2^32 (decoded with BigInt)"""
+    node_ids = np.asarray(node_ids)
+    if not len(node_ids) or node_ids.max() < 2 ** 32:
+        return {'node_ids': _compact(node_ids)}
+    if node_ids.min() < 0:
+        raise ValueError("Bundle arrays must be non-negative")
+    node_ids = node_ids.astype(np.uint64)
+    return {
+        'node_ids_lo': (node_ids & 0xFFFFFFFF).astype('<u4'),
+        'node_ids_hi': (node_ids >> 32).astype('<u4'),
+    }
+
+
+def bundle_arrays(graph, layout=False):
+    """Typed columns of the bundle from a cached graph (graph_cache.GraphArrays)"""
+    labels = np.asarray(graph.meta['labels'])
+    is_conspiracy = np.char.find(labels.astype(str), 'Conspiracy') >= 0
+    is_conspiracy &= np.char.find(labels.astype(str), 'Non_Conspiracy') < 0
+
+    arrays = {
+        **_id_columns(graph.node_ids),
+        'label_codes': _compact(graph.label_codes),
+        'category_codes': is_conspiracy[graph.label_codes].astype('<u1'),
+        'followers': _compact(graph.followers),
+        'degree': _compact(graph.actual_degree),
+        'indptr': _compact(graph.indptr),
+        'indices': _compact(graph.indices),
+    }
+    if layout:
+        if len(graph.node_ids) > MAX_LAYOUT_NODES:
+            raise ValueError(f"Layouts are only built for graphs up to {MAX_LAYOUT_NODES} nodes")
+        positions = nx.spring_layout(nx.from_scipy_sparse_array(graph.adjacency()), seed=42, iterations=50)
+        xy = np.array([positions[i] for i in range(len(graph.node_ids))], dtype=np.float64) * LAYOUT_SCALE
+        arrays['x'] = xy[:, 0].astype('<f4')
+        arrays['y'] = xy[:, 1].astype('<f4')
+    return arrays
+
+
+def encode_bundle(arrays, meta):
+    """Binary bundle: magic, header length, JSON header, then 8-byte aligned little-endian arrays"""
+    layout, offset, blobs = {}, 0, []
+    for name, array in arrays.items():
+        layout[name] = {'dtype': array.dtype.str, 'offset': offset, 'length': len(array)}
+        data = np.ascontiguousarray(array).tobytes()
+        blobs.append(data + b'\0' * (-len(data) % 8))
+        offset += len(blobs[-1])
+
+    header = json.dumps({**meta, 'arrays': layout}, separators=(',', ':')).encode()
+    header += b' ' * (-(len(header) + 8) % 8)
+    # Array offsets in the header are relative to the end of the header
+    return BUNDLE_MAGIC + struct.pack('<I', len(header)) + header + b''.join(blobs)
+
+
+def _write_atomic(path, data):
+    """Write bytes to path via a temporary file in the same directory"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def write_compressed(path, data):
+    """Write path plus its .gz (and .br, when brotli is installed) siblings, returning the files written"""
+    written = [path]
+    _write_atomic(path, data)
+    gz_path = path.with_name(path.name + '.gz')
+    _write_atomic(gz_path, gzip.compress(data, compresslevel=9, mtime=0))
+    written.append(gz_path)
+    if brotli is not None:
+        br_path = path.with_name(path.name + '.br')
+        _write_atomic(br_path, brotli.compress(data, quality=11))
+        written.append(br_path)
+    return written
+
+
+def build_bundle(data_dir=DATA_DIR, out_dir=BUNDLE_DIR, layout=False):
+    """Build the bundle for data_dir's CSVs, returning the manifest
+
+    The bundle file is named by its content hash, so it can be cached
+    forever; the small manifest (graph.json) points at the current one.
+    Bundles that are no longer referenced are removed.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    graph = open_graph_cache(data_dir)
+
+    meta = {
+        'format': 'infodemics-bundle',
+        'version': BUNDLE_VERSION,
+        'nodes': len(graph.node_ids),
+        'edges': int(len(graph.indices) // 2),
+        'labels': [str(label) for label in graph.meta['labels']],
+        'categories': list(CATEGORIES),
+        'layout': bool(layout),
+    }
+    data = encode_bundle(bundle_arrays(graph, layout), meta)
+    digest = hashlib.blake2b(data, digest_size=8).hexdigest()
+    bundle_name = f"graph-{digest}.bin"
+    written = write_compressed(out_dir / bundle_name, data)
+
+    manifest = {**meta, 'bundle': bundle_name, 'bytes': len(data)}
+    manifest.pop('labels')
+    write_compressed(out_dir / MANIFEST_NAME, json.dumps(manifest, indent=1).encode())
+
+    # Drop superseded bundles
+    for stale in out_dir.glob('graph-*.bin*'):
+        if stale not in written:
+            stale.unlink()
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the InfoDemics.html graph bundle from nodes.csv/edges.csv")
+    parser.add_argument("--data-dir", default=str(DATA_DIR), help="Directory with nodes.csv/edges.csv")
+    parser.add_argument("--out-dir", default=None, help="Output directory (default: <data-dir>/bundle)")
+    parser.add_argument("--layout", action="store_true", help="Precompute a spring layout (graphs up to 20k nodes)")
+    args = parser.parse_args(argv)
+
+    out_dir = Path(args.out_dir) if args.out_dir else Path(args.data_dir) / 'bundle'
+    manifest = build_bundle(args.data_dir, out_dir, args.layout)
+    sizes = {path.name: path.stat().st_size for path in sorted(out_dir.glob(manifest['bundle'] + '*'))}
+    print(f"Bundle {manifest['bundle']}: {manifest['nodes']} nodes, {manifest['edges']} edges")
+    for name, size in sizes.items():
+        print(f"  {name}: {size:,} bytes")
+    if brotli is None:
+        print("  (install brotli to also write .br files)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+InfoDemics - Corpus Simulator
+Simulates every graph of a multi-graph edge table at once on one block-diagonal sparse matrix
+"""
+
+import numpy as np
+import pandas as pd
+
+from sir_engine import (
+    SUSCEPTIBLE, INFECTED, RECOVERED, SEEDING_STREAM, DYNAMICS_STREAM,
+    seed_sequence, transmission_matrix, infection_probability
+)
+
+
+class CorpusSimulator:
+    """Directed SIR on all graph_ids together (same semantics as the notebook's EpidemicSimulator)"""
+
+    def __init__(self, edges_df, beta=0.25, gamma=0.05,
+                 source='src_node_id', target='dst_node_id', graph_col='graph_id', probability_col=None):
+        """
+        edges_df: edge table of the whole corpus (one row per edge, tagged with its graph)
+        beta: Infection Rate (used for every edge unless probability_col is given)
+        gamma: Recovery Rate
+        probability_col: optional column with a per-edge transmission probability
+        """
+        self.beta = beta
+        self.gamma = gamma
+
+        # Number nodes graph by graph so every graph is a contiguous diagonal block
+        columns = [graph_col, source, target] + ([probability_col] if probability_col else [])
+        edges = edges_df[columns].drop_duplicates([graph_col, source, target])
+        endpoints = pd.DataFrame({
+            'graph': np.concatenate([edges[graph_col].to_numpy(), edges[graph_col].to_numpy()]),
+            'node': np.concatenate([edges[source].to_numpy(), edges[target].to_numpy()]),
+        }).drop_duplicates().sort_values(['graph', 'node'], kind='stable', ignore_index=True)
+
+        self.graph_ids, graph_codes = np.unique(endpoints['graph'].to_numpy(), return_inverse=True)
+        self.node_ids = endpoints['node'].to_numpy()
+        self.node_graph = graph_codes
+
+        # First node of each graph block, plus the total as the final boundary
+        self.offsets = np.searchsorted(graph_codes, np.arange(len(self.graph_ids) + 1))
+        self.sizes = np.diff(self.offsets)
+
+        index = pd.MultiIndex.from_frame(endpoints[['graph', 'node']])
+        src = index.get_indexer(pd.MultiIndex.from_arrays([edges[graph_col], edges[source]]))
+        dst = index.get_indexer(pd.MultiIndex.from_arrays([edges[graph_col], edges[target]]))
+
+        # In-adjacency: row j lists the nodes that can infect j (their successors include j),
+        # with log(1 - p) per edge so pressure is a log-sum over infected predecessors
+        probability = edges[probability_col].to_numpy() if probability_col else beta
+        self.in_adjacency = transmission_matrix(src, dst, len(self.node_ids), probability)
+
+    def _segment_sum(self, values):
+        """Per-graph totals of a per-node array"""
+        return np.add.reduceat(values, self.offsets[:-1]) if len(values) else np.zeros(0)
+
+    def initial_state(self, patient_zero_ids=None, seed=None):
+        """Seed the given {graph_id: [node ids]} or one random node per graph"""
+        state = np.full(len(self.node_ids), SUSCEPTIBLE, dtype=np.int8)
+        if patient_zero_ids is None:
+            rng = np.random.default_rng(seed)
+            picks = self.offsets[:-1] + (rng.random(len(self.sizes)) * self.sizes).astype(np.int64)
+            state[picks] = INFECTED
+            return state
+
+        graph_code = {g: i for i, g in enumerate(self.graph_ids.tolist())}
+        for graph_id, node_ids in patient_zero_ids.items():
+            code = graph_code.get(graph_id)
+            if code is None:
+                continue
+            block = self.node_ids[self.offsets[code]:self.offsets[code + 1]]
+            found = np.isin(block, list(node_ids))
+            state[self.offsets[code] + np.flatnonzero(found)] = INFECTED
+        return state
+
+    def run(self, patient_zero_ids=None, steps=50, seed=None):
+        """Run every graph for `steps` days, returning per-graph S/I/R counts and Infected_Pct"""
+        state = self.initial_state(patient_zero_ids, seed_sequence(seed, SEEDING_STREAM))
+        rng = np.random.default_rng(seed_sequence(seed, DYNAMICS_STREAM))
+        counts = np.empty((steps, 3, len(self.graph_ids)), dtype=np.int64)
+
+        for day in range(steps):
+            infected = state == INFECTED
+            susceptible = state == SUSCEPTIBLE
+
+            # 1. Record stats per graph (segment reductions over the blocks)
+            counts[day, SUSCEPTIBLE] = self._segment_sum(susceptible.astype(np.int64))
+            counts[day, INFECTED] = self._segment_sum(infected.astype(np.int64))
+            counts[day, RECOVERED] = self.sizes - counts[day, SUSCEPTIBLE] - counts[day, INFECTED]
+
+            # 2. Dynamics: one sparse product covers every graph
+            infection_prob = infection_probability(self.in_adjacency, infected, None)
+            draws = rng.random(len(state))
+
+            new_infected = susceptible & (draws < infection_prob)
+            new_recovered = infected & (draws < self.gamma)
+            state[new_infected] = INFECTED
+            state[new_recovered] = RECOVERED
+
+        days = np.arange(steps)
+        n_graphs = len(self.graph_ids)
+        return pd.DataFrame({
+            'graph_id': np.tile(self.graph_ids, steps),
+            'Day': np.repeat(days, n_graphs),
+            'S': counts[:, SUSCEPTIBLE].ravel(),
+            'I': counts[:, INFECTED].ravel(),
+            'R': counts[:, RECOVERED].ravel(),
+            'Infected_Pct': (counts[:, INFECTED] / np.maximum(self.sizes, 1) * 100).ravel(),
+        })
@@ -0,0 +1,149 @@
+"""
+InfoDemics - Shared Data Loader
+Loads the node/edge tables and builds the NetworkX graph in bulk
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+# Default location of nodes.csv / edges.csv (project root /data, overridable via env)
+DATA_DIR = Path(os.environ.get('INFODEMICS_DATA_DIR', Path(__file__).resolve().parent.parent / 'data'))
+
+# Spark-cleaned datasets written by notebooks/01_Data_Cleaning_Spark.ipynb
+PARQUET_NODES = 'all_nodes_clean.parquet'
+PARQUET_EDGES = 'all_edges_clean.parquet'
+
+
+def classify_labels(labels):
+    """Map raw graph labels to 'Conspiracy' / 'Non-Conspiracy' ("Other" is treated as Non-Conspiracy)"""
+    labels = labels.astype(str)
+    is_conspiracy = labels.str.contains('Conspiracy') & ~labels.str.contains('Non_Conspiracy')
+    return pd.Series(np.where(is_conspiracy, 'Conspiracy', 'Non-Conspiracy'), index=labels.index)
+
+
+def compute_degrees(node_ids, edges_df):
+    """Count edge endpoints per node with one grouped count (O(E))"""
+    endpoint_counts = pd.concat([edges_df['source'], edges_df['target']], ignore_index=True).value_counts()
+    return node_ids.map(endpoint_counts).fillna(0).astype(np.int64)
+
+
+def prepare_nodes(nodes_df, edges_df):
+    """Rename raw columns and add the category and actual_degree columns"""
+    nodes_df = nodes_df.rename(columns={
+        'followers': 'followers_count',
+        'friends': 'degree'
+    })
+    nodes_df['category'] = classify_labels(nodes_df['label'])
+    nodes_df['actual_degree'] = compute_degrees(nodes_df['id'], edges_df)
+    return nodes_df
+
+
+def read_network_csv(data_dir=DATA_DIR):
+    """Parse nodes.csv / edges.csv and preprocess them (raises FileNotFoundError)"""
+    data_dir = Path(data_dir)
+    nodes_df = pd.read_csv(data_dir / 'nodes.csv')
+    edges_df = pd.read_csv(data_dir / 'edges.csv')
+    return prepare_nodes(nodes_df, edges_df), edges_df
+
+
+def has_parquet_corpus(data_dir=DATA_DIR):
+    """Whether data_dir holds the Spark-cleaned Parquet datasets"""
+    data_dir = Path(data_dir)
+    return (data_dir / PARQUET_NODES).exists() and (data_dir / PARQUET_EDGES).exists()
+
+
+def _parquet_dataset(path):
+    """Open a (possibly partitioned) Parquet dataset with pyarrow"""
+    try:
+        import pyarrow.dataset as ds
+    except ImportError:
+        raise ImportError("Reading Parquet data requires pyarrow: pip install pyarrow")
+    return ds.dataset(str(path), format='parquet'), ds
+
+
+def list_graph_ids(data_dir=DATA_DIR):
+    """Distinct graph_id values of the Parquet corpus (reads only that column)"""
+    dataset, _ = _parquet_dataset(Path(data_dir) / PARQUET_NODES)
+    graph_ids = dataset.to_table(columns=['graph_id']).column('graph_id').unique()
+    return sorted(graph_ids.to_pylist())
+
+
+def read_network_parquet(data_dir=DATA_DIR, graph_ids=None):
+    """Read the Parquet corpus, projecting the needed columns and pushing the graph_id filter down"""
+    data_dir = Path(data_dir)
+    nodes_dataset, ds = _parquet_dataset(data_dir / PARQUET_NODES)
+    edges_dataset, _ = _parquet_dataset(data_dir / PARQUET_EDGES)
+
+    # Row groups whose graph_id statistics don't match are skipped entirely
+    row_filter = ds.field('graph_id').isin(list(graph_ids)) if graph_ids else None
+
+    nodes_df = nodes_dataset.to_table(
+        columns=['id', 'label', 'followers', 'friends'], filter=row_filter
+    ).to_pandas()
+    edges_df = edges_dataset.to_table(
+        columns=['src_node_id', 'dst_node_id'], filter=row_filter
+    ).to_pandas().rename(columns={'src_node_id': 'source', 'dst_node_id': 'target'})
+
+    return prepare_nodes(nodes_df, edges_df), edges_df
+
+
+def load_network_data(data_dir=DATA_DIR, use_cache=True, graph_ids=None):
+    """Load the preprocessed node/edge tables
+
+    Reads the Parquet corpus when data_dir contains one (optionally limited to
+    graph_ids), otherwise the CSV exports via the binary graph cache.
+    """
+    if has_parquet_corpus(data_dir):
+        return read_network_parquet(data_dir, graph_ids)
+    if not use_cache:
+        return read_network_csv(data_dir)
+
+    from graph_cache import open_graph_cache
+    graph = open_graph_cache(data_dir)
+    return graph.nodes_frame(), graph.edges_frame()
+
+
+def load_network_adjacency(data_dir=DATA_DIR, graph_ids=None):
+    """Memory-mapped CSR adjacency from the graph cache, in load_network_data's node order
+
+    None for the Parquet corpus, which has no graph cache.
+    """
+    if has_parquet_corpus(data_dir):
+        return None
+    from graph_cache import open_graph_cache
+    return open_graph_cache(data_dir).adjacency()
+
+
+def filter_superspreaders(nodes_df, superspreader_pct=1):
+    """Drop nodes above the (100 - pct) degree percentile, returning (kept_nodes, removed_count)"""
+    threshold = np.percentile(nodes_df['actual_degree'], 100 - superspreader_pct)
+    keep = nodes_df['actual_degree'] <= threshold
+    return nodes_df[keep].copy(), int((~keep).sum())
+
+
+def build_graph(nodes_df, edges_df):
+    """Build an undirected graph from the node/edge tables in bulk"""
+    G = nx.Graph()
+
+    # Add nodes with attributes (plain Python values so the graph serializes cleanly)
+    attributes = zip(
+        nodes_df['category'].tolist(),
+        nodes_df['followers_count'].tolist(),
+        nodes_df['actual_degree'].tolist(),
+        nodes_df['label'].tolist()
+    )
+    G.add_nodes_from(
+        (node_id, {'label': category, 'followers_count': followers, 'degree': degree, 'original_label': label})
+        for node_id, (category, followers, degree, label) in zip(nodes_df['id'].tolist(), attributes)
+    )
+
+    # Add edges whose endpoints both exist (one vectorized membership test)
+    node_ids = nodes_df['id'].to_numpy()
+    mask = edges_df['source'].isin(node_ids) & edges_df['target'].isin(node_ids)
+    G.add_edges_from(edges_df.loc[mask, ['source', 'target']].to_numpy().tolist())
+
+    return G
@@ -0,0 +1,113 @@
+"""
+InfoDemics - Event-Driven Engine
+Continuous-time SIR/SEIR driven by a priority queue of transmission and recovery events
+"""
+
+import heapq
+
+import numpy as np
+
+from sir_engine import SUSCEPTIBLE, INFECTED, RECOVERED, EXPOSED, collect_history
+
+# Event kinds, in tie-break order
+_INFECT = 0
+_ACTIVATE = 1
+_RECOVER = 2
+
+
+def step_prob_to_rate(p):
+    """Rate whose per-unit-time event probability equals the discrete-time probability p"""
+    if p >= 1.0:
+        return np.inf
+    return -np.log1p(-p)
+
+
+def _waiting_times(rate, rng, size=None):
+    """Exponential waiting times for a rate (0 -> never, inf -> immediately)"""
+    if rate == 0:
+        return np.full(size, np.inf) if size is not None else np.inf
+    if np.isinf(rate):
+        return np.zeros(size) if size is not None else 0.0
+    return rng.exponential(1.0 / rate, size)
+
+
+def event_driven_steps(adjacency, state, beta, gamma, time_steps=50, model_type='SIR', alpha=0.10, seed=None):
+    """Yield ({'time', 'S', 'I', 'R'[, 'E']}, state) at every integer time of a continuous-time SIR/SEIR run
+
+    beta, gamma and alpha are the per-step probabilities used by the discrete
+    engines; they are converted to rates so one time unit matches one step.
+    Work is proportional to the number of events, not nodes x steps: between
+    two grid times only the queued events are processed.
+    """
+    state = np.array(state, dtype=np.int8)
+    rng = np.random.default_rng(seed)
+    indptr, indices = adjacency.indptr, adjacency.indices
+    t_max = time_steps - 1
+
+    beta_rate = step_prob_to_rate(beta)
+    gamma_rate = step_prob_to_rate(gamma)
+    alpha_rate = step_prob_to_rate(alpha)
+
+    counts = np.bincount(state, minlength=4).tolist()
+
+    # Earliest pending infection time per node (avoids queueing later duplicates)
+    pending_infection = np.full(len(state), np.inf)
+    queue = []
+
+    def become_infectious(node, t):
+        """Schedule the recovery of a newly infectious node and its transmissions before it"""
+        recovery_time = t + _waiting_times(gamma_rate, rng)
+        if recovery_time <= t_max:
+            heapq.heappush(queue, (recovery_time, _RECOVER, node))
+
+        neighbors = indices[indptr[node]:indptr[node + 1]]
+        neighbors = neighbors[state[neighbors] == SUSCEPTIBLE]
+        if len(neighbors) == 0:
+            return
+        transmit_times = t + _waiting_times(beta_rate, rng, len(neighbors))
+        useful = (transmit_times < recovery_time) & (transmit_times <= t_max) \
+            & (transmit_times < pending_infection[neighbors])
+        for target, when in zip(neighbors[useful].tolist(), transmit_times[useful].tolist()):
+            pending_infection[target] = when
+            heapq.heappush(queue, (when, _INFECT, target))
+
+    def transition(node, new_state):
+        """Move a node to a new compartment, keeping the counters in sync"""
+        counts[state[node]] -= 1
+        counts[new_state] += 1
+        state[node] = new_state
+
+    for node in np.flatnonzero(state == INFECTED).tolist():
+        become_infectious(node, 0.0)
+
+    for grid_time in range(time_steps):
+        # Apply every event up to and including this grid time
+        while queue and queue[0][0] <= grid_time:
+            t, kind, node = heapq.heappop(queue)
+
+            if kind == _INFECT:
+                if state[node] != SUSCEPTIBLE:
+                    continue
+                if model_type == 'SEIR':
+                    transition(node, EXPOSED)
+                    activation_time = t + _waiting_times(alpha_rate, rng)
+                    if activation_time <= t_max:
+                        heapq.heappush(queue, (activation_time, _ACTIVATE, node))
+                else:
+                    transition(node, INFECTED)
+                    become_infectious(node, t)
+            elif kind == _ACTIVATE:
+                transition(node, INFECTED)
+                become_infectious(node, t)
+            else:
+                transition(node, RECOVERED)
+
+        snapshot = {'time': grid_time, 'S': counts[SUSCEPTIBLE], 'I': counts[INFECTED], 'R': counts[RECOVERED]}
+        if model_type == 'SEIR':
+            snapshot['E'] = counts[EXPOSED]
+        yield snapshot, state
+
+
+def run_event_driven(adjacency, state, beta, gamma, time_steps=50, model_type='SIR', alpha=0.10, seed=None):
+    """Run a continuous-time SIR or SEIR epidemic, returning (sir_history, final_state) like run_sir_csr"""
+    return collect_history(event_driven_steps(adjacency, state, beta, gamma, time_steps, model_type, alpha, seed))
@@ -0,0 +1,155 @@
+"""
+InfoDemics - Binary Graph Cache
+Stores the processed graph as memory-mapped .npy columns keyed by a hash of the source CSVs
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from data_loader import classify_labels, read_network_csv
+
+# Bump when the on-disk layout changes so stale caches are ignored
+CACHE_VERSION = 2
+CACHE_DIR = Path(__file__).resolve().parent.parent / '.cache' / 'graphs'
+
+SOURCE_FILES = ('nodes.csv', 'edges.csv')
+ARRAY_NAMES = (
+    'node_ids', 'label_codes', 'followers', 'friends', 'actual_degree',
+    'edge_source', 'edge_target', 'indptr', 'indices'
+)
+
+
+def source_hash(data_dir):
+    """Content hash of nodes.csv and edges.csv (plus the cache layout version)"""
+    digest = hashlib.blake2b(f"v{CACHE_VERSION}".encode(), digest_size=16)
+    for name in SOURCE_FILES:
+        digest.update(name.encode())
+        with open(Path(data_dir) / name, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class GraphArrays:
+    """Read-only, memory-mapped view of one cached graph"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / 'meta.json', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        for name in ARRAY_NAMES:
+            setattr(self, name, np.load(self.path / f'{name}.npy', mmap_mode='r'))
+
+    @property
+    def labels(self):
+        """Raw label of every node"""
+        return np.asarray(self.meta['labels'], dtype=object)[self.label_codes]
+
+    def adjacency(self):
+        """Undirected CSR adjacency in node_ids order (shares the mapped index arrays)"""
+        n_nodes = len(self.node_ids)
+        data = np.ones(len(self.indices), dtype=np.float32)
+        return sp.csr_matrix((data, self.indices, self.indptr), shape=(n_nodes, n_nodes))
+
+    def nodes_frame(self):
+        """Preprocessed node table with the same columns as data_loader.prepare_nodes"""
+        labels = pd.Series(self.labels)
+        return pd.DataFrame({
+            'id': self.node_ids,
+            'label': labels,
+            'followers_count': self.followers,
+            'degree': self.friends,
+            'category': classify_labels(labels),
+            'actual_degree': self.actual_degree,
+        })
+
+    def edges_frame(self):
+        """Raw edge table"""
+        return pd.DataFrame({'source': self.edge_source, 'target': self.edge_target})
+
+
+def _csr_arrays(node_ids, sources, targets):
+    """Symmetric CSR (indptr, indices) over edges whose endpoints are both known nodes"""
+    n_nodes = len(node_ids)
+    order = np.argsort(node_ids, kind='stable')
+    sorted_ids = node_ids[order]
+
+    mask = np.isin(sources, node_ids) & np.isin(targets, node_ids)
+    rows = order[np.searchsorted(sorted_ids, sources[mask])]
+    cols = order[np.searchsorted(sorted_ids, targets[mask])]
+
+    # Undirected: store both directions, drop duplicates and self-loops
+    keys = np.unique(np.concatenate([rows * n_nodes + cols, cols * n_nodes + rows]))
+    rows, cols = np.divmod(keys, n_nodes)
+    keep = rows != cols
+    rows, cols = rows[keep], cols[keep]
+
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_nodes), out=indptr[1:])
+
+    # One index dtype for both arrays, so scipy wraps the mapped files instead of converting them
+    index_dtype = np.int32 if indptr[-1] < 2 ** 31 and n_nodes < 2 ** 31 else np.int64
+    return indptr.astype(index_dtype), cols.astype(index_dtype)
+
+
+def write_graph_cache(nodes_df, edges_df, path):
+    """Write a preprocessed node/edge table to a cache directory (atomically)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=path.parent, prefix='.tmp-'))
+
+    try:
+        node_ids = nodes_df['id'].to_numpy(dtype=np.int64)
+        sources = edges_df['source'].to_numpy(dtype=np.int64)
+        targets = edges_df['target'].to_numpy(dtype=np.int64)
+        label_codes, labels = pd.factorize(nodes_df['label'].astype(str))
+        indptr, indices = _csr_arrays(node_ids, sources, targets)
+
+        arrays = {
+            'node_ids': node_ids,
+            'label_codes': label_codes.astype(np.int32),
+            'followers': nodes_df['followers_count'].to_numpy(dtype=np.int64),
+            'friends': nodes_df['degree'].to_numpy(dtype=np.int64),
+            'actual_degree': nodes_df['actual_degree'].to_numpy(dtype=np.int64),
+            'edge_source': sources,
+            'edge_target': targets,
+            'indptr': indptr,
+            'indices': indices,
+        }
+        for name, array in arrays.items():
+            np.save(tmp_dir / f'{name}.npy', array)
+
+        with open(tmp_dir / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': CACHE_VERSION,
+                'labels': labels.tolist(),
+                'nodes': len(node_ids),
+                'edges': len(sources),
+            }, f)
+
+        os.replace(tmp_dir, path)
+    except OSError:
+        # Another process finished the same cache first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not (path / 'meta.json').exists():
+            raise
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def open_graph_cache(data_dir, cache_dir=CACHE_DIR):
+    """Open the cached graph for data_dir, building it from the CSVs on first use"""
+    path = Path(cache_dir) / source_hash(data_dir)
+    if not (path / 'meta.json').exists():
+        nodes_df, edges_df = read_network_csv(data_dir)
+        write_graph_cache(nodes_df, edges_df, path)
+    return GraphArrays(path)
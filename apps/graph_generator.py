@@ -0,0 +1,300 @@
+"""
+InfoDemics - Synthetic Graph Generator
+Fits degree, label and follower distributions from the node/edge tables and streams arbitrarily large look-alike graphs
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATA_DIR, compute_degrees
+from sir_engine import seed_sequence
+
+# Rows generated and written per chunk
+NODE_CHUNK = 1_000_000
+EDGE_CHUNK = 2_000_000
+
+# Attribute rows kept per label for bootstrapping (bounds the profile size on big inputs)
+MAX_PROFILE_ROWS = 10_000
+
+# Fewest tail points a power-law fit is accepted on
+MIN_TAIL_POINTS = 10
+
+# Separate random streams for node attributes, degrees and edges
+NODE_STREAM, DEGREE_STREAM, EDGE_STREAM = 0, 1, 2
+
+
+def fit_power_law_tail(degrees):
+    """(xmin, alpha, KS distance) of the discrete power-law tail that fits best (Clauset et al., 2009)
+
+    Returns None when no candidate xmin leaves enough tail points.
+    """
+    degrees = np.sort(np.asarray(degrees, dtype=np.float64))
+    best = None
+    for xmin in np.unique(degrees[degrees >= 1]):
+        tail = degrees[degrees >= xmin]
+        if len(tail) < MIN_TAIL_POINTS:
+            break
+        # Continuous MLE with the discrete correction xmin - 1/2
+        alpha = 1.0 + len(tail) / np.log(tail / (xmin - 0.5)).sum()
+        empirical = np.arange(1, len(tail) + 1) / len(tail)
+        fitted = 1.0 - ((tail + 0.5) / (xmin - 0.5)) ** (1.0 - alpha)
+        distance = float(np.abs(empirical - fitted).max())
+        if best is None or distance < best[2]:
+            best = (int(xmin), float(alpha), distance)
+    return best
+
+
+def fit_profile(nodes_df, edges_df, seed=0):
+    """JSON-serializable profile of a raw node/edge table pair (id,label,followers,friends / source,target)
+
+    Degrees below the fitted power-law xmin keep their empirical
+    distribution; the tail is the fitted power law, so larger graphs grow
+    proportionally larger hubs. Followers/friends are bootstrapped per label
+    and edges keep the observed share that stays within one label.
+    """
+    rng = np.random.default_rng(seed)
+    degree = compute_degrees(nodes_df['id'], edges_df).to_numpy()
+    labels = nodes_df['label'].astype(str)
+    label_mix = labels.value_counts(normalize=True).sort_index()
+
+    tail = fit_power_law_tail(degree)
+    xmin = tail[0] if tail else int(degree.max(initial=0)) + 1
+    body_values, body_counts = np.unique(degree[degree < xmin], return_counts=True)
+
+    # Share of edges (between known nodes) whose endpoints carry the same label
+    label_of = pd.Series(labels.to_numpy(), index=nodes_df['id'])
+    known = edges_df['source'].isin(label_of.index) & edges_df['target'].isin(label_of.index)
+    sources = label_of.reindex(edges_df.loc[known, 'source']).to_numpy()
+    targets = label_of.reindex(edges_df.loc[known, 'target']).to_numpy()
+    same_label = float((sources == targets).mean()) if len(sources) else 0.0
+
+    attributes = {}
+    for label in label_mix.index:
+        rows = nodes_df.loc[labels == label, ['followers', 'friends']].to_numpy(dtype=np.int64)
+        if len(rows) > MAX_PROFILE_ROWS:
+            rows = rows[rng.choice(len(rows), MAX_PROFILE_ROWS, replace=False)]
+        attributes[label] = rows.tolist()
+
+    return {
+        'source_nodes': int(len(nodes_df)),
+        'source_edges': int(len(edges_df)),
+        'mean_degree': float(degree.mean()) if len(degree) else 0.0,
+        'labels': {label: float(share) for label, share in label_mix.items()},
+        'same_label_edges': same_label,
+        'degree': {
+            'body_values': body_values.tolist(),
+            'body_weights': (body_counts / max(len(degree), 1)).tolist(),
+            'tail_xmin': int(xmin),
+            'tail_alpha': tail[1] if tail else None,
+            'tail_share': float((degree >= xmin).mean()) if tail else 0.0,
+        },
+        'attributes': attributes,
+    }
+
+
+def profile_from_data(data_dir=DATA_DIR, seed=0):
+    """Profile of data_dir's raw nodes.csv/edges.csv"""
+    data_dir = Path(data_dir)
+    return fit_profile(pd.read_csv(data_dir / 'nodes.csv'), pd.read_csv(data_dir / 'edges.csv'), seed)
+
+
+def sample_degrees(profile, size, max_degree, rng):
+    """Target degrees: empirical body, power-law tail capped at max_degree"""
+    spec = profile['degree']
+    values = np.zeros(size, dtype=np.int64)
+    in_tail = rng.random(size) < spec['tail_share']
+
+    if spec['body_values']:
+        weights = np.asarray(spec['body_weights'])
+        values[~in_tail] = rng.choice(spec['body_values'], int((~in_tail).sum()), p=weights / weights.sum())
+    if spec['tail_alpha'] is not None and in_tail.any():
+        # Inverse-CDF draw from the continuous approximation, rounded to integers >= xmin
+        u = rng.random(int(in_tail.sum()))
+        xmin, alpha = spec['tail_xmin'], spec['tail_alpha']
+        tail = (xmin - 0.5) * (1.0 - u) ** (-1.0 / (alpha - 1.0)) + 0.5
+        values[in_tail] = np.minimum(np.floor(tail), max_degree).astype(np.int64)
+    return values
+
+
+class TableWriter:
+    """Streams DataFrame chunks into one CSV or Parquet file"""
+
+    def __init__(self, path, schema, file_format='csv'):
+        self.path = Path(path)
+        self.format = file_format
+        self.rows = 0
+        if file_format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            self._pa = pa
+            self._schema = pa.schema(schema)
+            self._writer = pq.ParquetWriter(self.path, self._schema, compression='zstd')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8', newline='')
+            self._file.write(','.join(name for name, _ in schema) + '\n')
+
+    def write(self, frame):
+        """Append one chunk"""
+        if self.format == 'parquet':
+            self._writer.write_table(self._pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False))
+        else:
+            frame.to_csv(self._file, header=False, index=False)
+        self.rows += len(frame)
+
+    def close(self):
+        if self.format == 'parquet':
+            self._writer.close()
+        else:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _node_schema():
+    import pyarrow as pa
+    return [('id', pa.int64()), ('label', pa.string()), ('followers', pa.int64()), ('friends', pa.int64())]
+
+
+def _edge_schema():
+    import pyarrow as pa
+    return [('source', pa.int64()), ('target', pa.int64())]
+
+
+def _csv_schema(names):
+    return [(name, None) for name in names]
+
+
+def generate_graph(profile, n_nodes, out_dir, n_edges=None, file_format='csv', seed=0, log=None):
+    """Write a synthetic graph of n_nodes to out_dir/nodes.<ext> and edges.<ext>, returning (nodes, edges)
+
+    Nodes are laid out label block by label block with ids 1..n_nodes. Edges
+    are Chung-Lu: endpoints are drawn proportionally to their target degree,
+    and the target stays within the source's label with the profile's
+    probability. Only the per-node cumulative degree (8 bytes per node) is
+    held in memory; nodes and edges are written EDGE_CHUNK rows at a time.
+    Self-loops are dropped and duplicate pairs are left in, as in raw
+    exports (build_graph merges them).
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    ext = 'parquet' if file_format == 'parquet' else 'csv'
+    node_schema = _node_schema() if ext == 'parquet' else _csv_schema(['id', 'label', 'followers', 'friends'])
+    edge_schema = _edge_schema() if ext == 'parquet' else _csv_schema(['source', 'target'])
+
+    node_rng = np.random.default_rng(seed_sequence(seed, NODE_STREAM))
+    degree_rng = np.random.default_rng(seed_sequence(seed, DEGREE_STREAM))
+    labels = list(profile['labels'])
+    counts = node_rng.multinomial(n_nodes, list(profile['labels'].values()))
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+
+    # Nodes, one label block at a time; keep only the running degree total per node
+    cumulative = np.empty(n_nodes, dtype=np.int64)
+    total = 0
+    max_degree = max(n_nodes - 1, 0)
+    with TableWriter(out_dir / f'nodes.{ext}', node_schema, ext) as nodes_out:
+        for label, start, stop in zip(labels, bounds[:-1], bounds[1:]):
+            rows = np.asarray(profile['attributes'][label], dtype=np.int64).reshape(-1, 2)
+            for chunk_start in range(start, stop, NODE_CHUNK):
+                chunk_stop = min(chunk_start + NODE_CHUNK, stop)
+                size = chunk_stop - chunk_start
+                picked = rows[node_rng.integers(0, len(rows), size)] if len(rows) else np.zeros((size, 2), np.int64)
+                degrees = sample_degrees(profile, size, max_degree, degree_rng)
+                cumulative[chunk_start:chunk_stop] = total + np.cumsum(degrees)
+                total += int(degrees.sum())
+                nodes_out.write(pd.DataFrame({
+                    'id': np.arange(chunk_start + 1, chunk_stop + 1, dtype=np.int64),
+                    'label': label,
+                    'followers': picked[:, 0],
+                    'friends': picked[:, 1],
+                }))
+            if log:
+                log(f"  nodes: {label} {stop - start:,}")
+
+    if n_edges is None:
+        n_edges = total // 2
+    if total == 0 or n_nodes < 2:
+        n_edges = 0
+
+    # Degree mass at each label block's start/end, for within-label draws
+    starts = np.concatenate([[0], cumulative])
+    block_lo, block_hi = starts[bounds[:-1]], starts[bounds[1:]]
+
+    written = 0
+    start_time = time.perf_counter()
+    with TableWriter(out_dir / f'edges.{ext}', edge_schema, ext) as edges_out:
+        for chunk, chunk_start in enumerate(range(0, n_edges, EDGE_CHUNK)):
+            rng = np.random.default_rng(seed_sequence(seed, EDGE_STREAM, chunk))
+            size = min(EDGE_CHUNK, n_edges - chunk_start)
+
+            # Endpoint i is drawn with probability degree_i / total (cumulative sums, exact integers)
+            sources = np.searchsorted(cumulative, rng.integers(0, total, size), side='right')
+            block = np.searchsorted(bounds, sources, side='right') - 1
+            within = (rng.random(size) < profile['same_label_edges']) & (block_hi[block] > block_lo[block])
+            draws = rng.integers(0, total, size)
+            span = block_hi[block] - block_lo[block]
+            draws[within] = block_lo[block[within]] + (draws[within] % span[within])
+            targets = np.searchsorted(cumulative, draws, side='right')
+
+            keep = sources != targets
+            edges_out.write(pd.DataFrame({'source': sources[keep] + 1, 'target': targets[keep] + 1}))
+            written += int(keep.sum())
+            if log:
+                elapsed = time.perf_counter() - start_time
+                log(f"  edges: {written:,} / ~{n_edges:,} ({written / max(elapsed, 1e-9):,.0f} edges/s)")
+
+    return n_nodes, written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a large synthetic graph shaped like the InfoDemics data")
+    parser.add_argument("--nodes", type=float, default=None, help="Number of nodes, e.g. 1e6")
+    parser.add_argument("--edges", type=float, default=None,
+                        help="Number of edges (default: from the fitted mean degree; alone, it also sets --nodes)")
+    parser.add_argument("--out-dir", required=True, help="Directory for nodes/edges files")
+    parser.add_argument("--format", choices=['csv', 'parquet'], default='csv')
+    parser.add_argument("--data-dir", default=str(DATA_DIR), help="Source nodes.csv/edges.csv to fit")
+    parser.add_argument("--profile", help="Use a saved profile instead of fitting --data-dir")
+    parser.add_argument("--save-profile", help="Write the fitted profile to this JSON file")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (same seed, same graph)")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        with open(args.profile, encoding='utf-8') as f:
+            profile = json.load(f)
+    else:
+        profile = profile_from_data(args.data_dir, args.seed)
+    if args.save_profile:
+        with open(args.save_profile, 'w', encoding='utf-8') as f:
+            json.dump(profile, f)
+
+    if args.nodes is None and args.edges is None:
+        parser.error("give --nodes and/or --edges")
+    n_edges = int(args.edges) if args.edges is not None else None
+    if args.nodes is not None:
+        n_nodes = int(args.nodes)
+    else:
+        n_nodes = int(math.ceil(2 * n_edges / max(profile['mean_degree'], 1e-9)))
+
+    tail = profile['degree']
+    print(f"Profile: {profile['source_nodes']} nodes, mean degree {profile['mean_degree']:.2f}, "
+          f"tail alpha {tail['tail_alpha'] if tail['tail_alpha'] is None else round(tail['tail_alpha'], 2)} "
+          f"from degree {tail['tail_xmin']}, {profile['same_label_edges']:.0%} same-label edges", file=sys.stderr)
+    nodes, edges = generate_graph(profile, n_nodes, args.out_dir, n_edges, args.format, args.seed,
+                                  log=lambda message: print(message, file=sys.stderr, flush=True))
+    print(f"Wrote {nodes:,} nodes and {edges:,} edges to {args.out_dir}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
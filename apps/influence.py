@@ -0,0 +1,238 @@
+"""
+InfoDemics - Influence Maximization
+Finds the k seed accounts with the largest expected spread from reverse-reachable (RR) set samples
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from sweep import SharedGraph
+
+# RR sets drawn per vectorized batch (and per worker task)
+RR_BATCH = 50_000
+
+
+def transmissibility(beta, gamma=None):
+    """Probability that an infected node ever infects a given susceptible neighbor
+
+    With gamma=None this is the independent-cascade probability beta (one
+    attempt per edge). With a recovery rate it matches the discrete SIR
+    engines, where a node makes one attempt per step until it recovers.
+    """
+    if gamma is None:
+        return beta
+    if gamma <= 0:
+        return 1.0 if beta > 0 else 0.0
+    return 1.0 - gamma * (1.0 - beta) / (1.0 - (1.0 - gamma) * (1.0 - beta))
+
+
+def sample_rr_sets(indptr, indices, n_sets, probability, rng):
+    """Sample RR sets with one breadth-first pass over all of them at once
+
+    indptr/indices are the in-adjacency (row v lists the nodes that can infect
+    v). Returns (set_ids, nodes): one entry per (RR set, member) pair.
+    """
+    n_nodes = len(indptr) - 1
+    roots = rng.integers(0, n_nodes, n_sets)
+    frontier_sets = np.arange(n_sets, dtype=np.int64)
+    frontier_nodes = roots.astype(np.int64)
+
+    # Visited (set, node) pairs as sorted int64 keys set * n_nodes + node
+    visited = np.sort(frontier_sets * n_nodes + frontier_nodes)
+    set_parts, node_parts = [frontier_sets], [frontier_nodes]
+
+    while len(frontier_nodes):
+        # In-neighbors of every frontier node, tagged with the RR set they extend
+        starts = indptr[frontier_nodes]
+        lengths = indptr[frontier_nodes + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            break
+        positions = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(total)
+        owners = np.repeat(frontier_sets, lengths)
+
+        # Each edge is live independently with the transmission probability
+        live = rng.random(total) < probability
+        keys = np.unique(owners[live] * n_nodes + indices[positions[live]])
+        found = np.searchsorted(visited, keys)
+        found = (found < len(visited)) & (visited[np.minimum(found, len(visited) - 1)] == keys)
+        keys = keys[~found]
+
+        visited = np.union1d(visited, keys)
+        frontier_sets, frontier_nodes = keys // n_nodes, keys % n_nodes
+        set_parts.append(frontier_sets)
+        node_parts.append(frontier_nodes)
+
+    return np.concatenate(set_parts), np.concatenate(node_parts)
+
+
+def max_coverage(set_ids, nodes, n_sets, n_nodes, k):
+    """Greedy k nodes covering the most RR sets, returning (seeds, covered fraction)"""
+    # node -> sets and set -> nodes, as sorted index arrays with offsets
+    by_node = np.argsort(nodes, kind='stable')
+    node_ptr = np.searchsorted(nodes[by_node], np.arange(n_nodes + 1))
+    by_set = np.argsort(set_ids, kind='stable')
+    set_ptr = np.searchsorted(set_ids[by_set], np.arange(n_sets + 1))
+
+    counts = np.bincount(nodes, minlength=n_nodes).astype(np.int64)
+    covered = np.zeros(n_sets, dtype=bool)
+    seeds = []
+
+    for _ in range(min(k, n_nodes)):
+        node = int(np.argmax(counts))
+        seeds.append(node)
+
+        # Newly covered sets no longer count for any of their members
+        sets = set_ids[by_node[node_ptr[node]:node_ptr[node + 1]]]
+        sets = np.unique(sets[~covered[sets]])
+        covered[sets] = True
+        starts = set_ptr[sets]
+        lengths = set_ptr[sets + 1] - starts
+        positions = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(int(lengths.sum()))
+        np.subtract.at(counts, nodes[by_set[positions]], 1)
+        counts[node] = -1
+
+    return np.array(seeds, dtype=np.int64), covered.sum() / max(n_sets, 1)
+
+
+# Per-worker in-adjacency, attached once by _init_worker
+_worker_blocks = []
+_worker_arrays = {}
+
+
+def _init_worker(spec):
+    """Attach a worker process to the shared in-adjacency (no copy)"""
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _worker_blocks.append(block)
+        _worker_arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def _sample_task(n_sets, probability, seed_sequence):
+    """Worker entry point: sample one batch of RR sets"""
+    rng = np.random.default_rng(seed_sequence)
+    return sample_rr_sets(_worker_arrays['indptr'], _worker_arrays['indices'], n_sets, probability, rng)
+
+
+class RRSampler:
+    """Grows one pool of RR sets on demand, in-process or across a process pool"""
+
+    def __init__(self, in_adjacency, probability, max_workers=None, seed=0):
+        self.indptr = in_adjacency.indptr.astype(np.int64)
+        self.indices = in_adjacency.indices.astype(np.int64)
+        self.n_nodes = len(self.indptr) - 1
+        self.probability = probability
+        self.n_sets = 0
+        self._set_parts, self._node_parts = [], []
+        self._seeds = np.random.SeedSequence(seed)
+
+        self._shared = None
+        self._executor = None
+        if max_workers is not None and max_workers > 1:
+            self._shared = SharedGraph({'indptr': self.indptr, 'indices': self.indices})
+            self._executor = ProcessPoolExecutor(
+                max_workers=max_workers, initializer=_init_worker, initargs=(self._shared.spec,)
+            )
+
+    def extend(self, target):
+        """Sample until the pool holds at least `target` RR sets"""
+        missing = int(target) - self.n_sets
+        if missing <= 0:
+            return
+        sizes = [RR_BATCH] * (missing // RR_BATCH) + ([missing % RR_BATCH] if missing % RR_BATCH else [])
+        seeds = self._seeds.spawn(len(sizes))
+
+        if self._executor is not None:
+            futures = [self._executor.submit(_sample_task, size, self.probability, s) for size, s in zip(sizes, seeds)]
+            batches = [future.result() for future in futures]
+        else:
+            batches = [
+                sample_rr_sets(self.indptr, self.indices, size, self.probability, np.random.default_rng(s))
+                for size, s in zip(sizes, seeds)
+            ]
+
+        for size, (set_ids, nodes) in zip(sizes, batches):
+            self._set_parts.append(set_ids + self.n_sets)
+            self._node_parts.append(nodes)
+            self.n_sets += size
+
+    def reset(self):
+        """Drop the pool; sets sampled afterwards are independent of the dropped ones"""
+        self.n_sets = 0
+        self._set_parts, self._node_parts = [], []
+
+    def select(self, k):
+        """Greedy seeds over the current pool, returning (seeds, estimated spread)"""
+        set_ids = np.concatenate(self._set_parts)
+        nodes = np.concatenate(self._node_parts)
+        seeds, fraction = max_coverage(set_ids, nodes, self.n_sets, self.n_nodes, k)
+        return seeds, fraction * self.n_nodes
+
+    def close(self):
+        """Shut the worker pool down and release shared memory"""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _log_binomial(n, k):
+    """log C(n, k)"""
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+
+def influence_maximization(in_adjacency, k, beta, gamma=None, epsilon=0.5, ell=1.0,
+                           max_rr_sets=2_000_000, max_workers=None, seed=0):
+    """Top-k seeds by expected spread (IMM), returning (seed indices, estimated spread)
+
+    Follows IMM (Tang et al., 2015): a doubling search lower-bounds the
+    optimal spread, which fixes how many RR sets give a (1 - 1/e - epsilon)
+    approximation with probability 1 - n^-ell; greedy max coverage over
+    a fresh sample of that many sets picks the seeds (reusing the search's
+    sets would bias the estimate, see Chen 2018). max_rr_sets caps the
+    sample for very small spreads. Set max_workers > 1 to sample on a
+    process pool.
+    """
+    n_nodes = in_adjacency.shape[0]
+    k = min(k, n_nodes)
+    if n_nodes <= 1 or k == 0:
+        return np.arange(k, dtype=np.int64), float(k)
+
+    probability = transmissibility(beta, gamma)
+    log_n = math.log(n_nodes)
+    ell = ell * (1 + math.log(2) / log_n)
+    log_choose = _log_binomial(n_nodes, k)
+
+    with RRSampler(in_adjacency, probability, max_workers, seed) as sampler:
+        # Phase 1: doubling search for a lower bound on the optimal spread
+        eps_prime = math.sqrt(2) * epsilon
+        lambda_prime = ((2 + 2 / 3 * eps_prime)
+                        * (log_choose + ell * log_n + math.log(max(math.log2(n_nodes), 1.0)))
+                        * n_nodes / eps_prime ** 2)
+        lower_bound = 1.0
+        for i in range(1, max(int(math.log2(n_nodes)), 2)):
+            x = n_nodes / 2 ** i
+            sampler.extend(min(lambda_prime / x, max_rr_sets))
+            _, spread = sampler.select(k)
+            if spread >= (1 + eps_prime) * x or sampler.n_sets >= max_rr_sets:
+                lower_bound = spread / (1 + eps_prime)
+                break
+
+        # Phase 2: enough fresh RR sets for the final guarantee, then greedy selection
+        alpha = math.sqrt(ell * log_n + math.log(2))
+        beta_term = math.sqrt((1 - 1 / math.e) * (log_choose + ell * log_n + math.log(2)))
+        lambda_star = 2 * n_nodes * ((1 - 1 / math.e) * alpha + beta_term) ** 2 / epsilon ** 2
+        sampler.reset()
+        sampler.extend(min(lambda_star / max(lower_bound, 1.0), max_rr_sets))
+        return sampler.select(k)
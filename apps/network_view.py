@@ -0,0 +1,260 @@
+"""
+InfoDemics - Network Rendering
+Builds bounded, pre-laid-out views of the graph for PyVis
+"""
+
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+import networkx as nx
+from pyvis.network import Network
+
+from result_store import graph_hash
+
+# Upper bounds on what is sent to the browser
+MAX_RENDER_NODES = 500
+MAX_RENDER_EDGES = 3000
+
+# Layout coordinates are scaled to roughly the canvas size
+LAYOUT_SCALE = 1000
+
+STATE_COLORS = {
+    'I': '#FF4B4B',  # Red for Infected
+    'E': '#FF9800',  # Orange for Exposed (SEIR)
+    'R': '#4CAF50',  # Green for Recovered
+    'S': '#1E88E5'   # Blue for Susceptible
+}
+
+VIEW_STRATEGIES = {
+    'degree': 'Top nodes by degree',
+    'kcore': 'Densest k-core (sampled)',
+    'community': 'Communities collapsed'
+}
+
+# Recently built (view graph, positions, description), keyed by graph signature and view settings
+# (shared by every Streamlit session thread, so only touched under the lock)
+_VIEW_CACHE_SIZE = 16
+_view_cache = OrderedDict()
+_view_lock = threading.Lock()
+
+# Rendered network HTML, keyed by graph version, removal/view settings and final-state hash (same locking)
+_HTML_CACHE_SIZE = 32
+_html_cache = OrderedDict()
+_html_lock = threading.Lock()
+
+
+def state_signature(states):
+    """Hash of a {node: state} mapping (None when there are no states yet)"""
+    if not states:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(''.join(states.values()).encode())
+    return digest.hexdigest()
+
+
+def _kcore_nodes(G, max_nodes):
+    """Nodes of the largest k-core that fits, or a snowball sample of the innermost core"""
+    core = nx.core_number(G)
+    nodes = np.array(list(core.keys()), dtype=object)
+    numbers = np.array(list(core.values()))
+
+    # Lowest k whose core still fits
+    for k in np.unique(numbers):
+        members = nodes[numbers >= k]
+        if len(members) <= max_nodes:
+            return members.tolist()
+
+    # Even the innermost core is too big: grow a connected sample from its best-connected node
+    inner = G.subgraph(members.tolist())
+    start = max(inner.degree(), key=lambda x: x[1])[0]
+    keep = [start]
+    for _, reached in nx.bfs_edges(inner, start):
+        keep.append(reached)
+        if len(keep) >= max_nodes:
+            break
+    return keep
+
+
+def _community_view(G, max_nodes):
+    """Collapse label-propagation communities into weighted super-nodes"""
+    communities = sorted(nx.community.fast_label_propagation_communities(G, seed=0), key=len, reverse=True)
+    communities = communities[:max_nodes]
+    community_of = {node: i for i, members in enumerate(communities) for node in members}
+
+    H = nx.Graph()
+    for i, members in enumerate(communities):
+        members = list(members)
+        labels = Counter(G.nodes[n]['label'] for n in members)
+        H.add_node(
+            f"C{i}",
+            label=labels.most_common(1)[0][0],
+            followers_count=sum(G.nodes[n]['followers_count'] for n in members),
+            degree=sum(G.degree(n) for n in members),
+            members=members
+        )
+
+    # Edges between communities, weighted by how many original edges they stand for
+    weights = Counter()
+    for u, v in G.edges():
+        cu, cv = community_of.get(u), community_of.get(v)
+        if cu is not None and cv is not None and cu != cv:
+            weights[(min(cu, cv), max(cu, cv))] += 1
+    H.add_weighted_edges_from((f"C{a}", f"C{b}", w) for (a, b), w in weights.items())
+    return H
+
+
+def _cap_edges(H, max_edges):
+    """Keep the max_edges edges between the best-connected endpoints"""
+    if H.number_of_edges() <= max_edges:
+        return H
+    degree = dict(H.degree())
+    ranked = sorted(H.edges(), key=lambda e: degree[e[0]] + degree[e[1]], reverse=True)
+    capped = nx.Graph()
+    capped.add_nodes_from(H.nodes(data=True))
+    capped.add_edges_from((u, v, H.edges[u, v]) for u, v in ranked[:max_edges])
+    return capped
+
+
+def reduce_graph(G, max_nodes=MAX_RENDER_NODES, strategy='degree'):
+    """Bounded view of G for rendering, returning (view graph, description)"""
+    if G.number_of_nodes() <= max_nodes:
+        H, description = G, f"Full network ({G.number_of_nodes()} nodes)"
+    elif strategy == 'community':
+        H = _community_view(G, max_nodes)
+        description = f"{H.number_of_nodes()} largest communities of {G.number_of_nodes()} nodes"
+    else:
+        if strategy == 'kcore':
+            keep = _kcore_nodes(G, max_nodes)
+        else:
+            keep = [n for n, _ in sorted(G.degree(), key=lambda x: x[1], reverse=True)[:max_nodes]]
+        H = G.subgraph(keep).copy()
+        description = f"{H.number_of_nodes()} of {G.number_of_nodes()} nodes ({VIEW_STRATEGIES[strategy]})"
+    return _cap_edges(H, MAX_RENDER_EDGES), description
+
+
+def compute_layout(H, seed=42):
+    """Server-side layout of a (bounded) view graph, in canvas coordinates"""
+    if H.number_of_nodes() == 0:
+        return {}
+    positions = nx.spring_layout(H, seed=seed, iterations=50)
+    return {node: (float(x) * LAYOUT_SCALE, float(y) * LAYOUT_SCALE) for node, (x, y) in positions.items()}
+
+
+def build_view(G, max_nodes=MAX_RENDER_NODES, strategy='degree'):
+    """(view graph, positions, description) for G: the bounded view and its layout"""
+    H, description = reduce_graph(G, max_nodes, strategy)
+    return H, compute_layout(H), description
+
+
+def network_view(G, max_nodes=MAX_RENDER_NODES, strategy='degree'):
+    """build_view, cached across reruns"""
+    key = (graph_hash(G), max_nodes, strategy)
+    with _view_lock:
+        view = _view_cache.get(key)
+        if view is not None:
+            _view_cache.move_to_end(key)
+            return view
+
+    # Built outside the lock so other sessions are not blocked by the layout
+    view = build_view(G, max_nodes, strategy)
+    with _view_lock:
+        _view_cache[key] = view
+        _view_cache.move_to_end(key)
+        while len(_view_cache) > _VIEW_CACHE_SIZE:
+            _view_cache.popitem(last=False)
+    return view
+
+
+def neighborhood_view(G, node, radius=1, max_nodes=MAX_RENDER_NODES):
+    """Drill-down view: the node's neighborhood out to `radius` hops, cut off at max_nodes"""
+    keep = [node]
+    for _, reached in nx.bfs_edges(G, node, depth_limit=radius):
+        keep.append(reached)
+        if len(keep) >= max_nodes:
+            break
+    return _cap_edges(G.subgraph(keep).copy(), MAX_RENDER_EDGES)
+
+
+def _node_color(node, node_data, states):
+    """Color of a node (or super-node) from simulation states or its original label"""
+    members = node_data.get('members')
+    if states:
+        if members is not None:
+            # Majority state among the community's members
+            state = Counter(states.get(m, 'S') for m in members).most_common(1)[0][0]
+        else:
+            state = states.get(node, 'S')
+        return STATE_COLORS.get(state, STATE_COLORS['S'])
+    return STATE_COLORS['I'] if node_data['label'] == 'Conspiracy' else STATE_COLORS['S']
+
+
+def create_pyvis_network(G, states=None, positions=None):
+    """Create interactive PyVis network visualization (fixed layout when positions are given)"""
+    net = Network(height='600px', width='100%', bgcolor='#ffffff', font_color='black')
+
+    # Configure physics (only needed when the browser lays the graph out)
+    if positions:
+        net.toggle_physics(False)
+    else:
+        net.barnes_hut(gravity=-8000, central_gravity=0.3, spring_length=200, spring_strength=0.001)
+
+    # Add nodes
+    for node in G.nodes():
+        node_data = G.nodes[node]
+        color = _node_color(node, node_data, states)
+        members = node_data.get('members')
+
+        if members is not None:
+            size = 10 + 5 * np.sqrt(len(members))
+            title = (f"Community {node}<br>Members: {len(members)}<br>Majority: {node_data['label']}"
+                     f"<br>Followers: {node_data['followers_count']}")
+        else:
+            # Size based on followers
+            size = 10 + (node_data['followers_count'] / 2)
+            title = f"ID: {node}<br>Category: {node_data['label']}<br>Followers: {node_data['followers_count']}<br>Degree: {node_data['degree']}"
+
+        extra = {}
+        if positions and node in positions:
+            extra = {'x': positions[node][0], 'y': positions[node][1], 'physics': False}
+
+        net.add_node(
+            node,
+            label=str(node),
+            color=color,
+            size=float(size),
+            title=title,
+            **extra
+        )
+
+    # Add edges
+    for u, v, data in G.edges(data=True):
+        if 'weight' in data:
+            net.add_edge(u, v, color='#cccccc', value=data['weight'], title=f"{data['weight']} edges")
+        else:
+            net.add_edge(u, v, color='#cccccc')
+
+    return net
+
+
+def render_html(G, states=None, positions=None):
+    """PyVis HTML of a view, rendered in memory"""
+    return create_pyvis_network(G, states, positions).generate_html()
+
+
+def network_html(key, G, states=None, positions=None):
+    """In-memory PyVis HTML for a view, reused while the key (graph, settings, states) is unchanged"""
+    with _html_lock:
+        html = _html_cache.get(key)
+        if html is not None:
+            _html_cache.move_to_end(key)
+            return html
+
+    html = render_html(G, states, positions)
+    with _html_lock:
+        _html_cache[key] = html
+        _html_cache.move_to_end(key)
+        while len(_html_cache) > _HTML_CACHE_SIZE:
+            _html_cache.popitem(last=False)
+    return html
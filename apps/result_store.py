@@ -0,0 +1,182 @@
+"""
+InfoDemics - Result Store
+Persists simulation results in SQLite, keyed by graph content hash, parameters and seed
+"""
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import networkx as nx
+
+from sir_engine import graph_to_csr
+
+# One database shared by every session and server process (overridable via env)
+RESULTS_DB = Path(os.environ.get(
+    'INFODEMICS_RESULTS_DB', Path(__file__).resolve().parent.parent / '.cache' / 'results.sqlite'
+))
+MAX_STORE_BYTES = int(os.environ.get('INFODEMICS_RESULTS_MAX_MB', 512)) * 1024 * 1024
+
+# Bump when the stored layout or the simulators' random streams change
+RESULT_VERSION = 2
+
+
+def _id_bytes(ids):
+    """Bytes of a node id sequence (object ids by repr, not by pointer)"""
+    ids = np.asarray(ids)
+    if ids.dtype == object:
+        return '\0'.join(map(repr, ids.tolist())).encode()
+    return ids.tobytes()
+
+
+def graph_hash(G):
+    """Content hash of a graph: node order, labels, followers and adjacency (memoized on frozen graphs)"""
+    if nx.is_frozen(G) and 'content_hash' in G.graph:
+        return G.graph['content_hash']
+
+    adjacency, nodes = graph_to_csr(G)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_id_bytes(nodes))
+    digest.update(np.asarray([G.nodes[n].get('label', '') for n in nodes]).tobytes())
+    digest.update(np.asarray([G.nodes[n].get('followers_count', 0) for n in nodes]).tobytes())
+    # Fixed dtypes: a cached CSR and one built from the graph must hash alike
+    for array, dtype in ((adjacency.indptr, np.int64), (adjacency.indices, np.int64), (adjacency.data, np.float32)):
+        digest.update(np.ascontiguousarray(array, dtype=dtype).tobytes())
+    content_hash = digest.hexdigest()
+
+    if nx.is_frozen(G):
+        G.graph['content_hash'] = content_hash
+    return content_hash
+
+
+def result_key(graph_content_hash, params, seed):
+    """Store key of one run: graph hash, JSON-normalized parameters and seed"""
+    payload = json.dumps(
+        {'version': RESULT_VERSION, 'graph': graph_content_hash, 'params': params, 'seed': seed},
+        sort_keys=True, default=str
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def pack_result(result):
+    """Serialize {name: array} / {section: {name: array}} into one compressed .npz blob"""
+    arrays = {}
+    for name, value in result.items():
+        if isinstance(value, dict):
+            for field, column in value.items():
+                arrays[f"{name}/{field}"] = np.asarray(column)
+        else:
+            arrays[name] = np.asarray(value)
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def unpack_result(blob):
+    """Inverse of pack_result (sections come back as dicts, 0-d arrays as scalars)"""
+    result = {}
+    with np.load(io.BytesIO(blob)) as npz:
+        for name in npz.files:
+            value = npz[name]
+            value = value.item() if value.ndim == 0 else value
+            if '/' in name:
+                section, field = name.split('/', 1)
+                result.setdefault(section, {})[field] = value
+            else:
+                result[name] = value
+    return result
+
+
+class ResultStore:
+    """Size-bounded SQLite store of packed results with least-recently-used eviction"""
+
+    def __init__(self, path=RESULTS_DB, max_bytes=MAX_STORE_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    params TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection in one transaction (safe across threads and processes)"""
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, key):
+        """Stored result for a key, or None"""
+        with self._connect() as db:
+            row = db.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        return unpack_result(row[0])
+
+    def contains(self, keys):
+        """Subset of keys that are already stored"""
+        keys = list(keys)
+        found = set()
+        with self._connect() as db:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                found.update(row[0] for row in db.execute(
+                    f"SELECT key FROM results WHERE key IN ({placeholders})", chunk
+                ))
+        return found
+
+    def put(self, key, params, result):
+        """Store a result, then evict the least recently used ones beyond max_bytes"""
+        payload = pack_result(result)
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO results (key, params, payload, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(params, sort_keys=True, default=str), payload, len(payload), now, now)
+            )
+            self._evict(db)
+
+    def _evict(self, db):
+        """Delete least recently used results until the total payload fits the budget"""
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in db.execute("SELECT key, size FROM results ORDER BY accessed"):
+            victims.append((key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        db.executemany("DELETE FROM results WHERE key = ?", victims)
+
+    def total_bytes(self):
+        """Stored payload size"""
+        with self._connect() as db:
+            return db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def __len__(self):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
@@ -5,6 +5,19 @@ Runs with minimal dependencies, generates HTML visualizations
 
 import sys
 import os
+import argparse
+
+parser = argparse.ArgumentParser(description="Run an InfoDemics SIR simulation")
+parser.add_argument("--data-dir", help="Directory with nodes.csv/edges.csv or the Parquet corpus")
+parser.add_argument("--graph-id", action="append", dest="graph_ids",
+                    help="Graph to load from the Parquet corpus (repeatable)")
+parser.add_argument("--seed", type=int, default=None,
+                    help="Random seed (runs with the same seed are reproducible)")
+parser.add_argument("--model", choices=["SIR", "SEIR"], default="SIR",
+                    help="SEIR adds an Exposed stage and runs on the event-driven engine")
+parser.add_argument("--alpha", type=float, default=0.10,
+                    help="SEIR per-step probability of an exposed node becoming infected")
+args = parser.parse_args()
 
 print("=" * 70)
 print("InfoDemics - Misinformation Spread Simulator")
@@ -38,6 +51,13 @@ except ImportError:
     missing.append("networkx")
     print("✗ networkx - MISSING")
 
+try:
+    import scipy
+    print("✓ scipy")
+except ImportError:
+    missing.append("scipy")
+    print("✗ scipy - MISSING")
+
 if missing:
     print("\n" + "=" * 70)
     print("⚠️  MISSING PACKAGES DETECTED")
@@ -51,12 +71,13 @@ if missing:
     print("  pacman -S mingw-w64-x86_64-python-pandas")
     print("  pacman -S mingw-w64-x86_64-python-numpy")
     print("  pacman -S mingw-w64-x86_64-python-networkx")
+    print("  pacman -S mingw-w64-x86_64-python-scipy")
     
     print("\nOPTION 2: Install Python from python.org")
     print("-" * 70)
     print("1. Download from: https://www.python.org/downloads/")
     print("2. Install with 'Add to PATH' checked")
-    print("3. Then run: pip install pandas numpy networkx")
+    print("3. Then run: pip install pandas numpy networkx scipy")
     
     print("\nOPTION 3: Use Google Colab (No installation needed!)")
     print("-" * 70)
@@ -70,49 +91,26 @@ if missing:
 # If we get here, all packages are available
 print("\n✓ All required packages installed!\n")
 
+from sir_engine import attach_csr, graph_to_csr, states_to_array, array_to_states, run_sir_csr
+from event_engine import run_event_driven
+from data_loader import DATA_DIR, load_network_adjacency, load_network_data, build_graph
+
+data_dir = args.data_dir or DATA_DIR
+
 # Load data
 print("Loading network data...")
 try:
-    nodes_df = pd.read_csv('nodes.csv')
-    edges_df = pd.read_csv('edges.csv')
+    nodes_df, edges_df = load_network_data(data_dir, graph_ids=args.graph_ids)
     print(f"✓ Loaded {len(nodes_df)} nodes and {len(edges_df)} edges\n")
 except FileNotFoundError as e:
     print(f"✗ Error: {e}")
-    print("Make sure nodes.csv and edges.csv are in the same directory!")
+    print(f"Make sure nodes.csv and edges.csv are in {data_dir}")
     sys.exit(1)
 
-# Preprocess data
-nodes_df = nodes_df.rename(columns={'followers': 'followers_count', 'friends': 'degree'})
-
-def classify_label(label):
-    if 'Non_Conspiracy' in str(label):
-        return 'Non-Conspiracy'
-    elif 'Conspiracy' in str(label):
-        return 'Conspiracy'
-    else:
-        return 'Non-Conspiracy'
-
-nodes_df['category'] = nodes_df['label'].apply(classify_label)
-
-# Calculate actual degree
-degree_dict = {}
-for node_id in nodes_df['id']:
-    degree = len(edges_df[edges_df['source'] == node_id]) + len(edges_df[edges_df['target'] == node_id])
-    degree_dict[node_id] = degree
-nodes_df['actual_degree'] = nodes_df['id'].map(degree_dict)
-
 # Create NetworkX graph
 print("Building network graph...")
-G = nx.Graph()
-
-for _, node in nodes_df.iterrows():
-    G.add_node(node['id'], label=node['category'], 
-               followers_count=node['followers_count'],
-               degree=node['actual_degree'])
-
-for _, edge in edges_df.iterrows():
-    if G.has_node(edge['source']) and G.has_node(edge['target']):
-        G.add_edge(edge['source'], edge['target'])
+# The simulation runs on the graph cache's memory-mapped CSR when there is one
+G = attach_csr(build_graph(nodes_df, edges_df), load_network_adjacency(data_dir, args.graph_ids))
 
 print(f"✓ Graph created: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges\n")
 
@@ -141,56 +139,37 @@ for i, node in enumerate(top_5, 1):
 
 # SIR Simulation
 print("\n" + "=" * 70)
-print("RUNNING SIR SIMULATION")
+print(f"RUNNING {args.model} SIMULATION")
 print("=" * 70)
 
 beta = 0.3
 gamma = 0.1
 time_steps = 50
 
-print(f"Parameters: β={beta}, γ={gamma}, time_steps={time_steps}\n")
+alpha_text = f", α={args.alpha}" if args.model == "SEIR" else ""
+print(f"Parameters: β={beta}, γ={gamma}{alpha_text}, time_steps={time_steps}, seed={args.seed}\n")
 
 # Initialize states
 states = {}
-conspiracy_nodes = [n for n in G.nodes() if G.nodes[n]['label'] == 'Conspiracy']
+conspiracy_nodes = {n for n in G.nodes() if G.nodes[n]['label'] == 'Conspiracy'}
 for node in G.nodes():
     states[node] = 'I' if node in conspiracy_nodes else 'S'
 
-# Track history
-sir_history = {'time': [], 'S': [], 'I': [], 'R': []}
-
 print("Running simulation...")
-for t in range(time_steps):
-    s_count = sum(1 for s in states.values() if s == 'S')
-    i_count = sum(1 for s in states.values() if s == 'I')
-    r_count = sum(1 for s in states.values() if s == 'R')
-    
-    sir_history['time'].append(t)
-    sir_history['S'].append(s_count)
-    sir_history['I'].append(i_count)
-    sir_history['R'].append(r_count)
-    
-    new_states = states.copy()
-    
-    # Infections
-    for node in G.nodes():
-        if states[node] == 'S':
-            infected_neighbors = [n for n in G.neighbors(node) if states[n] == 'I']
-            if infected_neighbors:
-                infection_prob = 1 - (1 - beta) ** len(infected_neighbors)
-                if np.random.random() < infection_prob:
-                    new_states[node] = 'I'
-    
-    # Recoveries
-    for node in G.nodes():
-        if states[node] == 'I':
-            if np.random.random() < gamma:
-                new_states[node] = 'R'
-    
-    states = new_states
-    
-    if (t + 1) % 10 == 0:
-        print(f"  Step {t+1}: S={s_count}, I={i_count}, R={r_count}")
+adjacency, node_order = graph_to_csr(G)
+if args.model == "SEIR":
+    sir_history, final_state = run_event_driven(
+        adjacency, states_to_array(states, node_order), beta, gamma, time_steps, "SEIR", args.alpha, seed=args.seed
+    )
+else:
+    sir_history, final_state = run_sir_csr(
+        adjacency, states_to_array(states, node_order), beta, gamma, time_steps, seed=args.seed
+    )
+states = array_to_states(final_state, node_order)
+
+for t in range(9, time_steps, 10):
+    exposed_text = f", E={sir_history['E'][t]}" if 'E' in sir_history else ""
+    print(f"  Step {t+1}: S={sir_history['S'][t]}{exposed_text}, I={sir_history['I'][t]}, R={sir_history['R'][t]}")
 
 print("\n✓ Simulation complete!\n")
 
@@ -204,6 +183,8 @@ print("=" * 70)
 print(f"Peak infection: {peak_infected} nodes at time step {peak_time}")
 print(f"Final state:")
 print(f"  Susceptible: {sir_history['S'][-1]}")
+if 'E' in sir_history:
+    print(f"  Exposed: {sir_history['E'][-1]}")
 print(f"  Infected: {sir_history['I'][-1]}")
 print(f"  Recovered: {sir_history['R'][-1]}")
 
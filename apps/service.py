@@ -0,0 +1,387 @@
+"""
+InfoDemics - Simulation Service
+Keeps graphs loaded and runs simulation/sweep jobs on one shared process pool for the JSON API
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import networkx as nx
+
+from batch import SCENARIO_DEFAULTS, SCENARIO_TYPES, run_scenario, scenario_key, scenario_params, scenario_seed
+from sweep import SharedGraph, attach_graph, run_point, parameter_grid, point_seed, sweep_key
+from sir_engine import attach_csr
+from result_store import ResultStore, graph_hash, result_key
+from data_loader import DATA_DIR, load_network_adjacency, load_network_data, build_graph
+
+# Jobs allowed to wait for the pool; further submissions are refused until the queue drains
+MAX_QUEUED_JOBS = int(os.environ.get('INFODEMICS_MAX_QUEUED_JOBS', 32))
+
+# Finished jobs kept for GET /api/jobs/<id>
+MAX_FINISHED_JOBS = 256
+
+# Distinct graph selections kept loaded (each holds a shared-memory copy of its adjacency)
+MAX_LOADED_GRAPHS = int(os.environ.get('INFODEMICS_MAX_LOADED_GRAPHS', 4))
+
+# Upper bound on the grid of one sweep job
+MAX_SWEEP_POINTS = 10_000
+
+# Job kinds, each with its own queue; the dispatcher takes one task from each in turn
+JOB_KINDS = ('simulation', 'sweep')
+
+
+class ServiceBusy(RuntimeError):
+    """The job queue is full (retry later)"""
+
+
+def _simulate_task(spec, scenario, seed):
+    """Worker entry point: one scenario on the shared graph described by spec"""
+    attach_graph(spec)
+    return run_scenario(scenario, seed)
+
+
+def _sweep_task(spec, point, time_steps, replicates, superspreader_pct, seed):
+    """Worker entry point: one sweep point on the shared graph described by spec"""
+    attach_graph(spec)
+    return run_point(point, time_steps, replicates, superspreader_pct, seed)
+
+
+def to_json(value):
+    """Plain-Python copy of a result (arrays to lists, numpy scalars to numbers)"""
+    if isinstance(value, dict):
+        return {str(k): to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class LoadedGraph:
+    """A frozen graph plus its shared-memory arrays, identified by its content hash"""
+
+    def __init__(self, G):
+        self.G = G
+        self.id = graph_hash(G)
+        self.shared = SharedGraph.from_graph(G)
+
+    def describe(self):
+        return {'graph': self.id, 'nodes': self.G.number_of_nodes(), 'edges': self.G.number_of_edges()}
+
+
+class Job:
+    """One API request: a list of pool tasks whose results are combined when the last one finishes"""
+
+    def __init__(self, kind, graph, request_key, tasks, finish):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.graph = graph
+        self.request_key = request_key
+        self.tasks = tasks            # [(function, args, store_key or None)]
+        self.results = [None] * len(tasks)
+        self.pending = deque()        # task indices still to be sent to the pool
+        self.finish = finish          # results -> JSON result
+        self.status = 'queued'
+        self.done = 0
+        self.stored = 0
+        self.error = None
+        self.result = None
+        self.created = time.time()
+        self.finished = threading.Event()
+
+    def describe(self, include_result=True):
+        info = {
+            'job': self.id, 'kind': self.kind, 'graph': self.graph, 'status': self.status,
+            'progress': {'done': self.done, 'total': len(self.tasks), 'from_store': self.stored},
+        }
+        if self.error is not None:
+            info['error'] = self.error
+        if include_result and self.status == 'done':
+            info['result'] = self.result
+        return info
+
+
+class SimulationService:
+    """Loaded graphs, a bounded job queue and one process pool shared by every client
+
+    Identical requests that arrive while a job is queued or running are
+    attached to that job instead of being simulated twice. Seeded tasks go
+    through the result store, so repeated requests finish without the pool.
+    Simulations and sweeps queue separately and the dispatcher alternates
+    between them task by task, so a large sweep does not hold up
+    /api/simulations; within a kind, jobs run in arrival order.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, max_workers=None, max_queued_jobs=MAX_QUEUED_JOBS, store=None):
+        self.data_dir = data_dir
+        self.max_workers = max_workers or os.cpu_count()
+        self.store = store
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        # At most two tasks per worker sit in the pool; the rest wait in the job queue
+        self._slots = threading.BoundedSemaphore(self.max_workers * 2)
+        self.max_queued_jobs = max_queued_jobs
+        self._queues = {kind: deque() for kind in JOB_KINDS}
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._closed = False
+        self._load_lock = threading.Lock()
+        self._graphs = OrderedDict()     # selection -> LoadedGraph
+        self._jobs = OrderedDict()       # job id -> Job
+        self._inflight = {}              # request key -> unfinished Job
+        self._dispatcher = threading.Thread(target=self._dispatch, name='infodemics-dispatcher', daemon=True)
+        self._dispatcher.start()
+
+    # Graphs
+
+    def load_graph(self, graph_ids=None):
+        """Load (or reuse) the graph of a graph_ids selection, returning its description"""
+        selection = tuple(sorted(graph_ids)) if graph_ids else None
+        with self._load_lock:
+            if selection in self._graphs:
+                self._graphs.move_to_end(selection)
+                return self._graphs[selection].describe()
+            if len(self._graphs) >= MAX_LOADED_GRAPHS:
+                raise ServiceBusy(f"At most {MAX_LOADED_GRAPHS} graphs can be loaded at once")
+            graph_ids = list(selection) if selection else None
+            nodes_df, edges_df = load_network_data(self.data_dir, graph_ids=graph_ids)
+            G = attach_csr(build_graph(nodes_df, edges_df), load_network_adjacency(self.data_dir, graph_ids))
+            loaded = LoadedGraph(nx.freeze(G))
+            self._graphs[selection] = loaded
+            return loaded.describe()
+
+    def graphs(self):
+        """Descriptions of the loaded graphs"""
+        with self._load_lock:
+            return [loaded.describe() for loaded in self._graphs.values()]
+
+    def _graph(self, graph_id):
+        """LoadedGraph by content hash (the first loaded graph when graph_id is None)"""
+        with self._load_lock:
+            for loaded in self._graphs.values():
+                if graph_id is None or loaded.id == graph_id:
+                    return loaded
+        if graph_id is None:
+            raise KeyError("No graph is loaded")
+        raise KeyError(f"Unknown graph '{graph_id}'")
+
+    # Jobs
+
+    def simulate(self, params):
+        """Submit one ensemble simulation (batch scenario fields), returning the job description"""
+        loaded = self._graph(params.get('graph'))
+        unknown = set(params) - set(SCENARIO_DEFAULTS) - {'graph'}
+        if unknown:
+            raise ValueError(f"Unknown simulation field(s) {sorted(unknown)}")
+        scenario = {**SCENARIO_DEFAULTS, **{k: v for k, v in params.items() if k != 'graph'}}
+        scenario = {k: (SCENARIO_TYPES[k](v) if k in SCENARIO_TYPES else v) for k, v in scenario.items()}
+        scenario['id'] = 'api'
+        if scenario['seed'] is not None:
+            scenario['seed'] = int(scenario['seed'])
+
+        seed = scenario['seed']
+        store_key = scenario_key(loaded.id, scenario, seed)
+        request_key = result_key(loaded.id, {'kind': 'simulate', **scenario_params(scenario)}, seed)
+        task = (_simulate_task, (loaded.shared.spec, scenario, scenario_seed(scenario, seed)), store_key)
+        return self._submit('simulation', loaded, request_key, [task], lambda results: to_json(results[0][1]))
+
+    def sweep(self, params):
+        """Submit a (beta, gamma, initial %, intervention) grid, returning the job description"""
+        loaded = self._graph(params.get('graph'))
+        grid = parameter_grid(
+            [float(v) for v in params.get('betas', [0.1, 0.3, 0.5])],
+            [float(v) for v in params.get('gammas', [0.1, 0.3, 0.5])],
+            [float(v) for v in params.get('initial_infected_pcts', [SCENARIO_DEFAULTS['initial_infected_pct']])],
+            [bool(v) for v in params.get('remove_options', [False])]
+        )
+        if not grid or len(grid) > MAX_SWEEP_POINTS:
+            raise ValueError(f"A sweep needs between 1 and {MAX_SWEEP_POINTS} grid points (got {len(grid)})")
+        time_steps = int(params.get('time_steps', SCENARIO_DEFAULTS['time_steps']))
+        replicates = int(params.get('replicates', 1))
+        superspreader_pct = float(params.get('superspreader_pct', SCENARIO_DEFAULTS['superspreader_pct']))
+        seed = int(params['seed']) if params.get('seed') is not None else None
+
+        tasks = [
+            (_sweep_task, (loaded.shared.spec, point, time_steps, replicates, superspreader_pct, point_seed(seed, point)),
+             sweep_key(loaded.id, point, time_steps, replicates, superspreader_pct, seed) if seed is not None else None)
+            for point in grid
+        ]
+        request_key = result_key(loaded.id, {
+            'kind': 'sweep', 'grid': grid, 'time_steps': time_steps,
+            'replicates': replicates, 'superspreader_pct': superspreader_pct
+        }, seed)
+
+        def finish(results):
+            rows = []
+            for point, metrics in results:
+                beta, gamma, initial_infected_pct, remove_superspreaders = point
+                rows.append({
+                    'beta': beta, 'gamma': gamma, 'initial_infected_pct': initial_infected_pct,
+                    'remove_superspreaders': remove_superspreaders, **to_json(metrics)
+                })
+            return {'points': rows}
+
+        return self._submit('sweep', loaded, request_key, tasks, finish)
+
+    def job(self, job_id, wait=0):
+        """Description of a job, optionally waiting up to `wait` seconds for it to finish"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Unknown job '{job_id}'")
+        if wait > 0:
+            job.finished.wait(wait)
+        return job.describe()
+
+    def status(self):
+        """Pool, queue and job counts"""
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            queued = sum(len(jobs) for jobs in self._queues.values())
+        return {
+            'workers': self.max_workers,
+            'queued_jobs': queued,
+            'max_queued_jobs': self.max_queued_jobs,
+            'jobs': counts,
+            'graphs': self.graphs(),
+        }
+
+    def _submit(self, kind, loaded, request_key, tasks, finish):
+        """Coalesce with an identical unfinished job, fill stored tasks, then queue the rest"""
+        with self._lock:
+            if request_key in self._inflight:
+                return self._inflight[request_key].describe()
+
+        # Store lookups happen outside the lock so other requests are not held up by SQLite
+        job = Job(kind, loaded.id, request_key, tasks, finish)
+        store_keys = [store_key for _, _, store_key in tasks if store_key is not None]
+        if self.store is not None and store_keys:
+            stored_keys = self.store.contains(store_keys)
+            for index, (_, _, store_key) in enumerate(tasks):
+                if store_key in stored_keys:
+                    stored = self.store.get(store_key)
+                    if stored is not None:
+                        job.results[index] = self._stored_result(kind, tasks[index], stored)
+                        job.done += 1
+                        job.stored += 1
+
+        with self._lock:
+            # An identical request may have been queued meanwhile
+            if request_key in self._inflight:
+                return self._inflight[request_key].describe()
+            if job.done == len(tasks):
+                self._jobs[job.id] = job
+                self._finish(job)
+            else:
+                if sum(len(jobs) for jobs in self._queues.values()) >= self.max_queued_jobs:
+                    raise ServiceBusy(f"Job queue is full ({self.max_queued_jobs} jobs waiting)")
+                # The dispatcher works from this snapshot and never reads job.results
+                job.pending.extend(index for index, result in enumerate(job.results) if result is None)
+                self._jobs[job.id] = job
+                self._queues[kind].append(job)
+                self._inflight[request_key] = job
+                self._ready.notify()
+            self._trim()
+            return job.describe()
+
+    @staticmethod
+    def _stored_result(kind, task, stored):
+        """A stored result in the (point or scenario id, result) shape its worker task returns"""
+        _, args, _ = task
+        return (args[1] if kind == 'sweep' else args[1]['id']), stored
+
+    def _dispatch(self):
+        """Feed queued jobs' tasks to the pool, one kind after the other, blocking while it is saturated"""
+        turn = 0
+        while True:
+            self._slots.acquire()
+            with self._ready:
+                while not self._closed and not any(self._queues.values()):
+                    self._ready.wait()
+                if self._closed:
+                    self._slots.release()
+                    return
+                kinds = [kind for kind in JOB_KINDS if self._queues[kind]]
+                jobs = self._queues[kinds[turn % len(kinds)]]
+                turn += 1
+                job = jobs[0]
+                job.status = 'running'
+                index = job.pending.popleft()
+                if not job.pending:
+                    # Every task is in the pool; only _task_done touches the job from here on
+                    jobs.popleft()
+            function, args, store_key = job.tasks[index]
+            try:
+                future = self._pool.submit(function, *args)
+            except RuntimeError:
+                # Pool shut down while jobs were still queued
+                self._slots.release()
+                return
+            future.add_done_callback(partial(self._task_done, job, index, store_key))
+
+    def _task_done(self, job, index, store_key, future):
+        """Record one finished task; the last one completes the job"""
+        self._slots.release()
+        error = None
+        try:
+            result = future.result()
+            # Tasks return (point or scenario id, result); the store holds the result like run_sweep does
+            if store_key is not None and self.store is not None:
+                self.store.put(store_key, {'kind': job.kind}, result[1])
+        except Exception as exc:
+            result, error = None, f"{type(exc).__name__}: {exc}"
+
+        with self._lock:
+            job.results[index] = result
+            if error is not None and job.error is None:
+                job.error = error
+            job.done += 1
+            if job.done == len(job.tasks):
+                self._finish(job)
+
+    def _finish(self, job):
+        """Combine a job's results and wake its waiters (caller holds the lock)"""
+        if job.error is None:
+            try:
+                job.result = job.finish(job.results)
+                job.status = 'done'
+            except Exception as exc:
+                job.error = f"{type(exc).__name__}: {exc}"
+        if job.error is not None:
+            job.status = 'failed'
+        job.results = None
+        self._inflight.pop(job.request_key, None)
+        job.finished.set()
+
+    def _trim(self):
+        """Forget the oldest finished jobs beyond MAX_FINISHED_JOBS (caller holds the lock)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished.is_set()]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def close(self):
+        """Stop the dispatcher and the pool, then release the shared graphs"""
+        with self._ready:
+            self._closed = True
+            self._ready.notify()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._load_lock:
+            for loaded in self._graphs.values():
+                loaded.shared.close()
+            self._graphs.clear()
+
+
+def default_service(max_workers=None):
+    """Service over the default data directory and result store, with its graph already loaded"""
+    service = SimulationService(max_workers=max_workers, store=ResultStore())
+    service.load_graph()
+    return service
@@ -0,0 +1,243 @@
+"""
+InfoDemics - Simulation Stages
+Graph build, SIR runs and the SIR chart of the app, importable without Streamlit
+"""
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+import plotly.graph_objects as go
+
+from sir_engine import (
+    graph_to_csr, states_to_array, array_to_states, collect_history, sir_csr_steps, sir_frontier_steps,
+    initial_state_matrix, run_sir_ensemble, quantile_key, ENSEMBLE_QUANTILES,
+    transmission_matrix, follower_edge_probability, replicate_generators, attach_csr
+)
+from event_engine import event_driven_steps
+from intervention import InfectedPriorityPolicy, AtRiskImmunizationPolicy, adaptive_steps
+from data_loader import filter_superspreaders, build_graph
+
+
+def network_from_tables(nodes_df, edges_df, remove_superspreaders=False, superspreader_pct=1, adjacency=None):
+    """Frozen NetworkX graph of the loaded tables, returning (G, removed_count)
+
+    With the graph cache's CSR adjacency (rows in nodes_df order) the
+    simulators run on it instead of converting the NetworkX graph.
+    """
+    removed_count = 0
+
+    # Remove super-spreaders if requested
+    if remove_superspreaders:
+        kept_df, removed_count = filter_superspreaders(nodes_df, superspreader_pct)
+        if adjacency is not None:
+            keep = nodes_df.index.get_indexer(kept_df.index)
+            adjacency = adjacency[keep][:, keep]
+        nodes_df = kept_df
+
+    # Frozen: the graph is shared across sessions, so it must never be mutated in place
+    return nx.freeze(attach_csr(build_graph(nodes_df, edges_df), adjacency)), removed_count
+
+
+def initialize_sir_states(G, initial_infected_pct, seed=None):
+    """Initialize SIR states for all nodes"""
+    nodes = list(G.nodes())
+    labels = np.array([G.nodes[n]['label'] for n in nodes])
+
+    # Conspiracy nodes start infected; random Non-Conspiracy nodes top up to the initial %
+    # (same rule and random stream as replicate 0 of an ensemble with this seed)
+    total_infected = int(len(nodes) * initial_infected_pct / 100)
+    state = initial_state_matrix(
+        labels == 'Conspiracy', labels == 'Non-Conspiracy', total_infected, 1, seed
+    )[0]
+
+    return array_to_states(state, nodes)
+
+
+SIMULATION_ENGINES = {
+    'frontier': sir_frontier_steps,
+    'discrete': sir_csr_steps,
+    'event': event_driven_steps
+}
+
+
+ADAPTIVE_POLICIES = {
+    'none': 'None',
+    'factcheck': 'Fact-check top infected by followers',
+    'quarantine': 'Quarantine infected hubs',
+    'immunize': 'Immunize at-risk hubs'
+}
+
+
+def make_policy(G, nodes, adjacency, policy):
+    """Build a per-step intervention policy over the CSR node order"""
+    if policy == 'factcheck':
+        return InfectedPriorityPolicy([G.nodes[n]['followers_count'] for n in nodes])
+    degree = np.diff(adjacency.indptr)
+    if policy == 'quarantine':
+        return InfectedPriorityPolicy(degree)
+    return AtRiskImmunizationPolicy(adjacency, degree)
+
+
+TRANSMISSION_MODES = {
+    'undirected': 'Undirected, uniform β',
+    'directed': 'Directed (source → target), uniform β',
+    'followers': 'Directed, β scaled by source followers'
+}
+
+
+def directed_transmission(G, nodes, edges_df, beta, mode='directed'):
+    """Directed transmission matrix over G's nodes from the edge table (per-edge probabilities)"""
+    index = pd.Index(nodes)
+    sources = index.get_indexer(edges_df['source'])
+    targets = index.get_indexer(edges_df['target'])
+
+    # Keep edges between nodes of G (removed super-spreaders drop out), once per direction
+    keep = (sources >= 0) & (targets >= 0) & (sources != targets)
+    pairs = np.unique(sources[keep].astype(np.int64) * len(nodes) + targets[keep])
+    sources, targets = pairs // len(nodes), pairs % len(nodes)
+
+    if mode == 'followers':
+        followers = [G.nodes[n]['followers_count'] for n in nodes]
+        probability = follower_edge_probability(followers, sources, beta)
+    else:
+        probability = beta
+    return transmission_matrix(sources, targets, len(nodes), probability)
+
+
+def sir_simulation_steps(G, beta, gamma, initial_infected_pct, time_steps=50, engine='frontier',
+                         policy='none', budget=10, transmission='undirected', edges_df=None, seed=None,
+                         model_type='SIR', alpha=0.10):
+    """Start an SIR simulation, returning (per-step generator, node order)
+
+    model_type='SEIR' adds an Exposed stage left at per-step probability
+    alpha; it runs on the event-driven engine with undirected transmission.
+    """
+    if model_type == 'SEIR' and (transmission != 'undirected' or policy != 'none'):
+        raise ValueError("SEIR runs undirected transmission without an adaptive policy")
+    states = initialize_sir_states(G, initial_infected_pct, seed)
+    rng = replicate_generators(seed, 1)[0]
+
+    # Run on a CSR adjacency with int8 states instead of per-node dict lookups
+    adjacency, nodes = graph_to_csr(G)
+    if transmission != 'undirected':
+        # Per-edge probabilities run on the full sparse step (log-sum pressure)
+        steps = sir_csr_steps(
+            directed_transmission(G, nodes, edges_df, beta, transmission),
+            states_to_array(states, nodes), None, gamma, time_steps, seed=rng
+        )
+    elif policy != 'none':
+        # Adaptive interventions act between steps of the active-frontier dynamics
+        steps = adaptive_steps(
+            adjacency, states_to_array(states, nodes), beta, gamma,
+            make_policy(G, nodes, adjacency, policy), budget, time_steps, seed=rng
+        )
+    elif model_type == 'SEIR':
+        steps = event_driven_steps(
+            adjacency, states_to_array(states, nodes), beta, gamma, time_steps, 'SEIR', alpha, seed=rng
+        )
+    else:
+        steps = SIMULATION_ENGINES[engine](
+            adjacency, states_to_array(states, nodes), beta, gamma, time_steps, seed=rng
+        )
+    return steps, nodes
+
+
+def run_sir_simulation(G, beta, gamma, initial_infected_pct, time_steps=50, engine='frontier',
+                       policy='none', budget=10, transmission='undirected', edges_df=None, seed=None,
+                       model_type='SIR', alpha=0.10):
+    """Run SIR model simulation ('frontier' or 'discrete' steps, or 'event'-driven continuous time)"""
+    steps, nodes = sir_simulation_steps(
+        G, beta, gamma, initial_infected_pct, time_steps, engine, policy, budget, transmission, edges_df, seed,
+        model_type, alpha
+    )
+    sir_history, final_state = collect_history(steps)
+    return sir_history, array_to_states(final_state, nodes)
+
+
+def run_sir_ensemble_simulation(G, beta, gamma, initial_infected_pct, replicates, time_steps=50,
+                                transmission='undirected', edges_df=None, seed=None):
+    """Run a Monte Carlo ensemble of SIR simulations in one batched pass"""
+    adjacency, nodes = graph_to_csr(G)
+    if transmission != 'undirected':
+        adjacency, beta = directed_transmission(G, nodes, edges_df, beta, transmission), None
+    labels = np.array([G.nodes[n]['label'] for n in nodes])
+
+    # Same seeding rule as initialize_sir_states, drawn independently per replicate
+    total_infected = int(len(nodes) * initial_infected_pct / 100)
+    initial_states = initial_state_matrix(
+        labels == 'Conspiracy', labels == 'Non-Conspiracy', total_infected, replicates, seed
+    )
+
+    sir_history, ensemble_stats, final_states = run_sir_ensemble(
+        adjacency, initial_states, beta, gamma, time_steps, seed=seed
+    )
+
+    # The network view shows the first replicate
+    return sir_history, ensemble_stats, array_to_states(final_states[0], nodes)
+
+
+def plot_sir_curves(sir_history):
+    """Create animated SIR curves using Plotly (with ensemble bands when available)"""
+    fig = go.Figure()
+
+    compartments = [
+        ('S', 'Susceptible', '#1E88E5', 'rgba(30, 136, 229, 0.2)'),
+        ('E', 'Exposed', '#FF9800', 'rgba(255, 152, 0, 0.2)'),
+        ('I', 'Infected', '#FF4B4B', 'rgba(255, 75, 75, 0.2)'),
+        ('R', 'Recovered', '#4CAF50', 'rgba(76, 175, 80, 0.2)')
+    ]
+    low_q, high_q = ENSEMBLE_QUANTILES[0], ENSEMBLE_QUANTILES[-1]
+
+    for key, name, color, band_color in compartments:
+        if key not in sir_history:
+            # Only SEIR runs have an Exposed curve
+            continue
+
+        # Quantile band from ensemble runs
+        upper_key, lower_key = quantile_key(key, high_q), quantile_key(key, low_q)
+        if upper_key in sir_history and lower_key in sir_history:
+            fig.add_trace(go.Scatter(
+                x=sir_history['time'],
+                y=sir_history[upper_key],
+                mode='lines',
+                line=dict(width=0),
+                showlegend=False,
+                hoverinfo='skip'
+            ))
+            fig.add_trace(go.Scatter(
+                x=sir_history['time'],
+                y=sir_history[lower_key],
+                mode='lines',
+                line=dict(width=0),
+                fill='tonexty',
+                fillcolor=band_color,
+                name=f'{name} ({int(low_q * 100)}-{int(high_q * 100)}%)',
+                hoverinfo='skip'
+            ))
+
+        fig.add_trace(go.Scatter(
+            x=sir_history['time'],
+            y=sir_history[key],
+            mode='lines+markers',
+            name=name,
+            line=dict(color=color, width=3),
+            marker=dict(size=6)
+        ))
+
+    fig.update_layout(
+        title='SIR Model: Misinformation Spread Over Time',
+        xaxis_title='Time Steps',
+        yaxis_title='Number of Nodes',
+        hovermode='x unified',
+        height=400,
+        template='plotly_white',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+
+    return fig
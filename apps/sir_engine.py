@@ -0,0 +1,381 @@
+"""
+InfoDemics - Vectorized SIR Engine
+Runs the SIR model on a CSR adjacency matrix with int8 node states
+"""
+
+import numpy as np
+import networkx as nx
+import scipy.sparse as sp
+
+# Integer node states (EXPOSED is only used by SEIR models)
+SUSCEPTIBLE = 0
+INFECTED = 1
+RECOVERED = 2
+EXPOSED = 3
+
+STATE_LABELS = np.array(['S', 'I', 'R', 'E'])
+
+# Per-replicate streams: initial seeding and dynamics never share random numbers
+SEEDING_STREAM = 0
+DYNAMICS_STREAM = 1
+
+
+def seed_sequence(seed=None, *key):
+    """SeedSequence for an int / None / SeedSequence seed, or its child at spawn path `key`
+
+    seed_sequence(s, i) equals the i-th child of SeedSequence(s).spawn(), but
+    is derived from the index alone, so it never depends on how many streams
+    were spawned before (or in which worker).
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + key, pool_size=seed.pool_size)
+    return np.random.SeedSequence(seed, spawn_key=key)
+
+
+def replicate_generators(seed, replicates, stream=DYNAMICS_STREAM):
+    """One independent Generator per replicate (replicate r uses the same stream in any batch size)"""
+    return [np.random.default_rng(seed_sequence(seed, r, stream)) for r in range(replicates)]
+
+
+def attach_csr(G, adjacency):
+    """Let graph_to_csr reuse a prebuilt CSR adjacency in G's node order (e.g. the memory-mapped graph cache)"""
+    if adjacency is not None and adjacency.shape[0] == G.number_of_nodes():
+        G.graph['csr'] = (adjacency, list(G.nodes()))
+    return G
+
+
+def graph_to_csr(G):
+    """Convert a NetworkX graph to a CSR adjacency matrix and its node order (or return the attached one)"""
+    if 'csr' in G.graph:
+        return G.graph['csr']
+    nodes = list(G.nodes())
+    adjacency = nx.to_scipy_sparse_array(G, nodelist=nodes, weight=None, dtype=np.float32, format='csr')
+    return adjacency, nodes
+
+
+def states_to_array(states, nodes):
+    """Convert a {node: 'S'/'I'/'R'/'E'} dict to an int8 state array in node order"""
+    lookup = {'S': SUSCEPTIBLE, 'I': INFECTED, 'R': RECOVERED, 'E': EXPOSED}
+    return np.fromiter((lookup[states[n]] for n in nodes), dtype=np.int8, count=len(nodes))
+
+
+def array_to_states(state, nodes):
+    """Convert an int8 state array back to a {node: 'S'/'I'/'R'/'E'} dict"""
+    return dict(zip(nodes, STATE_LABELS[state].tolist()))
+
+
+def transmission_matrix(sources, targets, n_nodes, probability):
+    """Directed in-adjacency holding log(1 - p) per edge, for per-edge transmission probabilities
+
+    Row v lists the nodes u that can infect v, so one product with the
+    infected indicator gives the log-probability that v escapes all of its
+    infected in-neighbors. probability is a scalar or one value per edge;
+    repeated (u, v) pairs act as independent attempts.
+    """
+    probability = np.broadcast_to(np.asarray(probability, dtype=np.float64), np.shape(sources))
+    # p = 1 would give log(0) = -inf, and -inf * 0 = nan for uninfected in-neighbors
+    log_escape = np.log1p(-np.clip(probability, 0.0, 1.0 - 1e-12))
+    return sp.csr_matrix((log_escape, (targets, sources)), shape=(n_nodes, n_nodes))
+
+
+def follower_edge_probability(followers, sources, beta):
+    """Per-edge probability: beta scaled by the source's log-followers (mean over edges stays beta)"""
+    reach = np.log1p(np.asarray(followers, dtype=np.float64))[sources]
+    if len(reach) and reach.mean() > 0:
+        reach = reach / reach.mean()
+    else:
+        reach = np.ones(len(reach))
+    return np.clip(beta * reach, 0.0, 1.0)
+
+
+def infection_probability(adjacency, infected, beta):
+    """Infection probability of every node given the infected indicator (a vector, or nodes x replicates)
+
+    With a scalar beta the adjacency counts infected neighbors; with
+    beta=None it is a transmission_matrix and pressure is the log-sum of
+    escape probabilities over infected in-neighbors.
+    """
+    if beta is None:
+        return -np.expm1(adjacency @ infected.astype(np.float64))
+    return 1.0 - np.power(1.0 - beta, adjacency @ infected.astype(np.float32))
+
+
+def sir_step(adjacency, state, beta, gamma, rng=None):
+    """Advance the state array by one discrete time step (in place; beta=None for a transmission_matrix)"""
+    rng = np.random.default_rng(rng)
+    infected = state == INFECTED
+
+    # Infection pressure from infected (in-)neighbors (one sparse mat-vec)
+    infection_prob = infection_probability(adjacency, infected, beta)
+
+    # One draw per node: S and I nodes are disjoint, so it serves both transitions
+    draws = rng.random(len(state))
+
+    # Process infections (S -> I)
+    new_infected = (state == SUSCEPTIBLE) & (draws < infection_prob)
+
+    # Process recoveries (I -> R)
+    new_recovered = infected & (draws < gamma)
+
+    state[new_infected] = INFECTED
+    state[new_recovered] = RECOVERED
+    return state
+
+
+def collect_history(steps):
+    """Drain a per-step generator into (sir_history, final_state)"""
+    sir_history = {'time': [], 'S': [], 'I': [], 'R': []}
+    state = None
+    for snapshot, state in steps:
+        for key, value in snapshot.items():
+            sir_history.setdefault(key, []).append(value)
+    return sir_history, state
+
+
+def pack_states(state):
+    """Pack an int8 state array into 2 bits per node (4 nodes per byte)"""
+    state = np.asarray(state, dtype=np.uint8)
+    padded = np.zeros((len(state) + 3) // 4 * 4, dtype=np.uint8)
+    padded[:len(state)] = state
+    quads = padded.reshape(-1, 4)
+    return quads[:, 0] | (quads[:, 1] << 2) | (quads[:, 2] << 4) | (quads[:, 3] << 6)
+
+
+def unpack_states(packed, n_nodes):
+    """Inverse of pack_states"""
+    packed = np.asarray(packed, dtype=np.uint8)
+    quads = np.stack([(packed >> shift) & 3 for shift in (0, 2, 4, 6)], axis=1)
+    return quads.ravel()[:n_nodes].astype(np.int8)
+
+
+class StateHistory:
+    """Per-step node states, kept as 2-bit packed frames ('packed') or transition events ('delta')
+
+    A 50-step history of a million nodes takes 12.5 MB packed; the delta log
+    stores the initial frame plus (node, new state) pairs per step, which is
+    smaller when few nodes change.
+    """
+
+    def __init__(self, n_nodes, mode='packed'):
+        if mode not in ('packed', 'delta'):
+            raise ValueError(f"Unknown history mode '{mode}' (expected 'packed' or 'delta')")
+        self.n_nodes = n_nodes
+        self.mode = mode
+        self._frames = []
+        self._events = []
+        self._previous = None
+
+    @classmethod
+    def from_frames(cls, frames, n_nodes):
+        """Rebuild a packed history from a (steps x bytes) frame matrix"""
+        history = cls(n_nodes)
+        history._frames = list(np.asarray(frames, dtype=np.uint8))
+        return history
+
+    def record(self, state):
+        """Append the state of the next step (the array is copied, never kept)"""
+        if self.mode == 'delta' and self._previous is not None:
+            changed = np.flatnonzero(state != self._previous)
+            self._events.append((changed.astype(np.int32), state[changed].astype(np.int8)))
+            self._previous[changed] = state[changed]
+            return
+
+        self._frames.append(pack_states(state))
+        if self.mode == 'delta':
+            self._previous = np.array(state, dtype=np.int8)
+
+    def __len__(self):
+        if self.mode == 'packed':
+            return len(self._frames)
+        return len(self._frames) + len(self._events)
+
+    def state_at(self, t):
+        """int8 state array at step t"""
+        if not 0 <= t < len(self):
+            raise IndexError(f"Step {t} outside the recorded 0-{len(self) - 1}")
+        if self.mode == 'packed':
+            return unpack_states(self._frames[t], self.n_nodes)
+        # Replay transitions on top of the initial frame
+        state = unpack_states(self._frames[0], self.n_nodes)
+        for nodes, new_states in self._events[:t]:
+            state[nodes] = new_states
+        return state
+
+    def frames(self):
+        """(steps x bytes) matrix of packed frames"""
+        if self.mode == 'packed':
+            return np.array(self._frames, dtype=np.uint8).reshape(len(self._frames), -1)
+        return np.array([pack_states(self.state_at(t)) for t in range(len(self))], dtype=np.uint8)
+
+    @property
+    def nbytes(self):
+        """Memory held by the recorded history"""
+        packed = sum(frame.nbytes for frame in self._frames)
+        return packed + sum(nodes.nbytes + new_states.nbytes for nodes, new_states in self._events)
+
+
+def recording(steps, history):
+    """Pass a per-step generator through, recording every yielded state into history"""
+    for snapshot, state in steps:
+        history.record(state)
+        yield snapshot, state
+
+
+def sir_csr_steps(adjacency, state, beta, gamma, time_steps=50, seed=None):
+    """Yield ({'time', 'S', 'I', 'R'}, state) at the start of every step of the full sparse engine"""
+    state = np.array(state, dtype=np.int8)
+    rng = np.random.default_rng(seed)
+
+    for t in range(time_steps):
+        s_count, i_count, r_count = np.bincount(state, minlength=3)[:3]
+        yield {'time': t, 'S': int(s_count), 'I': int(i_count), 'R': int(r_count)}, state
+
+        sir_step(adjacency, state, beta, gamma, rng)
+
+
+def run_sir_csr(adjacency, state, beta, gamma, time_steps=50, seed=None):
+    """Run the SIR model on a CSR adjacency (or a transmission_matrix with beta=None), returning (sir_history, final_state)"""
+    return collect_history(sir_csr_steps(adjacency, state, beta, gamma, time_steps, seed))
+
+
+def gather_neighbors(adjacency, nodes):
+    """Concatenated CSR neighbor lists of the given nodes (duplicates kept)"""
+    starts = adjacency.indptr[nodes]
+    lengths = adjacency.indptr[nodes + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=adjacency.indices.dtype)
+    positions = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(total)
+    return adjacency.indices[positions]
+
+
+def frontier_step(adjacency, state, infected_nodes, beta, gamma, rng):
+    """Advance the state by one step from its infected nodes (in place)
+
+    Returns (infected nodes after the step, newly infected nodes, number of
+    recoveries), from which the caller updates its S/I/R counters.
+    """
+    # Susceptible neighbors of the frontier, with their number of infected neighbors
+    neighbors = gather_neighbors(adjacency, infected_nodes)
+    neighbors = neighbors[state[neighbors] == SUSCEPTIBLE]
+    candidates, infected_neighbors = np.unique(neighbors, return_counts=True)
+
+    # Process infections (S -> I)
+    infection_prob = 1.0 - np.power(1.0 - beta, infected_neighbors)
+    new_infected = candidates[rng.random(len(candidates)) < infection_prob]
+
+    # Process recoveries (I -> R)
+    recovered = rng.random(len(infected_nodes)) < gamma
+
+    state[new_infected] = INFECTED
+    state[infected_nodes[recovered]] = RECOVERED
+    infected_nodes = np.concatenate([infected_nodes[~recovered], new_infected])
+    return infected_nodes, new_infected, int(np.count_nonzero(recovered))
+
+
+def sir_frontier_steps(adjacency, state, beta, gamma, time_steps=50, seed=None):
+    """Yield ({'time', 'S', 'I', 'R'}, state) per step, touching only infected nodes and their susceptible neighbors
+
+    Same dynamics as sir_csr_steps, but each step costs O(edges of infected
+    nodes) instead of O(N + E): S/I/R counters are updated from the
+    transitions rather than recounted, and once nobody is infected the
+    remaining steps are emitted without any work.
+    """
+    state = np.array(state, dtype=np.int8)
+    rng = np.random.default_rng(seed)
+    infected_nodes = np.flatnonzero(state == INFECTED)
+    s_count, i_count, r_count = (int(c) for c in np.bincount(state, minlength=3)[:3])
+
+    for t in range(time_steps):
+        yield {'time': t, 'S': s_count, 'I': i_count, 'R': r_count}, state
+        if i_count == 0:
+            continue
+
+        infected_nodes, new_infected, n_recovered = frontier_step(adjacency, state, infected_nodes, beta, gamma, rng)
+        s_count -= len(new_infected)
+        i_count += len(new_infected) - n_recovered
+        r_count += n_recovered
+
+
+def run_sir_frontier(adjacency, state, beta, gamma, time_steps=50, seed=None):
+    """Run the active-frontier SIR model, returning (sir_history, final_state)"""
+    return collect_history(sir_frontier_steps(adjacency, state, beta, gamma, time_steps, seed))
+
+# Quantiles reported by ensemble runs (lowest/highest form the plotted band)
+ENSEMBLE_QUANTILES = (0.05, 0.5, 0.95)
+
+
+def quantile_key(compartment, q):
+    """Column name of a quantile curve, e.g. quantile_key('I', 0.05) -> 'I_q05'"""
+    return f"{compartment}_q{int(round(q * 100)):02d}"
+
+
+def initial_state_matrix(seed_mask, candidate_mask, total_infected, replicates, seed=None):
+    """Build a (replicates x nodes) int8 state matrix with the same seeding rule as initialize_sir_states"""
+    n_nodes = len(seed_mask)
+    states = np.full((replicates, n_nodes), SUSCEPTIBLE, dtype=np.int8)
+    states[:, seed_mask] = INFECTED
+
+    # Every replicate draws its own additional random infections
+    candidates = np.flatnonzero(candidate_mask)
+    additional = min(max(0, total_infected - int(np.count_nonzero(seed_mask))), len(candidates))
+    if additional > 0:
+        for r, rng in enumerate(replicate_generators(seed, replicates, SEEDING_STREAM)):
+            states[r, rng.choice(candidates, size=additional, replace=False)] = INFECTED
+
+    return states
+
+
+def run_sir_ensemble(adjacency, initial_states, beta, gamma, time_steps=50, quantiles=ENSEMBLE_QUANTILES,
+                     seed=None):
+    """Run every replicate of a (replicates x nodes) state matrix together
+
+    Returns (sir_history, ensemble_stats, final_states). sir_history holds the
+    mean S/I/R curves plus one quantile curve per compartment and quantile, so
+    it can be used anywhere a single-run history is expected. Pass beta=None
+    with a transmission_matrix for directed, per-edge probabilities. Each
+    replicate draws from its own stream of `seed`, so replicate r is the same
+    whatever the ensemble size.
+    """
+    states = np.array(initial_states, dtype=np.int8)
+    replicates, n_nodes = states.shape
+    generators = replicate_generators(seed, replicates, DYNAMICS_STREAM)
+    draws = np.empty((replicates, n_nodes))
+
+    # counts[t, c, r]: nodes of compartment c in replicate r at step t
+    counts = np.empty((time_steps, 3, replicates), dtype=np.int32)
+
+    for t in range(time_steps):
+        infected = states == INFECTED
+        susceptible = states == SUSCEPTIBLE
+        counts[t, SUSCEPTIBLE] = susceptible.sum(axis=1)
+        counts[t, INFECTED] = infected.sum(axis=1)
+        counts[t, RECOVERED] = n_nodes - counts[t, SUSCEPTIBLE] - counts[t, INFECTED]
+
+        # One sparse product advances every replicate
+        infection_prob = infection_probability(adjacency, infected.T, beta).T
+
+        for rng, row in zip(generators, draws):
+            rng.random(out=row)
+        new_infected = susceptible & (draws < infection_prob)
+        new_recovered = infected & (draws < gamma)
+
+        states[new_infected] = INFECTED
+        states[new_recovered] = RECOVERED
+
+    sir_history = {'time': list(range(time_steps))}
+    for c, name in enumerate(('S', 'I', 'R')):
+        sir_history[name] = counts[:, c].mean(axis=1).tolist()
+    for c, name in enumerate(('S', 'I', 'R')):
+        for q, curve in zip(quantiles, np.quantile(counts[:, c], quantiles, axis=1)):
+            sir_history[quantile_key(name, q)] = curve.tolist()
+
+    infected_counts = counts[:, INFECTED]
+    ensemble_stats = {
+        'replicates': replicates,
+        'peak_infected': infected_counts.max(axis=0),
+        'peak_time': infected_counts.argmax(axis=0),
+        'final_recovered': counts[-1, RECOVERED],
+    }
+
+    return sir_history, ensemble_stats, states
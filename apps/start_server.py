@@ -3,26 +3,198 @@ Simple HTTP Server to run InfoDemics
 Just double-click this file or run: python3 start_server.py
 """
 
+import argparse
+import hashlib
 import http.server
-import socketserver
+import json
+import re
 import webbrowser
 import os
 from pathlib import Path
+from urllib.parse import urlsplit, parse_qs, unquote
 
 # Configuration
 PORT = 8000
 DIRECTORY = Path(__file__).parent.parent  # Point to project root
 
+# Largest accepted JSON request body, and longest a request may block with ?wait=
+MAX_BODY_BYTES = 1024 * 1024
+MAX_WAIT_SECONDS = 60
+
+# Precompressed siblings written by bundle.py (file.br / file.gz), best first
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+# Content-hashed files (e.g. data/bundle/graph-<hash>.bin) never change, so browsers may keep them
+IMMUTABLE_NAME = re.compile(r'-[0-9a-f]{16}\.\w+$')
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+
+# path -> (mtime_ns, size, etag), so files are only rehashed when they change
+_etags = {}
+
+def file_etag(path):
+    """Strong ETag from a file's bytes"""
+    stat = os.stat(path)
+    cached = _etags.get(path)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    etag = f'"{digest.hexdigest()}"'
+    _etags[path] = (stat.st_mtime_ns, stat.st_size, etag)
+    return etag
+
+def accepted_encodings(header):
+    """Content codings a client accepts (ignoring q=0)"""
+    accepted = set()
+    for token in (header or '').split(','):
+        name, _, params = token.strip().partition(';')
+        if name and params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(name.lower())
+    return accepted
+
+def hidden_path(url_path):
+    """Whether a request path reaches into a dot-directory or dot-file (.cache, .git, ...)"""
+    return any(part.startswith('.') for part in unquote(urlsplit(url_path).path).split('/'))
+
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Static files from the project root, plus the JSON API under /api/"""
+    service = None  # SimulationService shared by all request threads (None: static files only)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(DIRECTORY), **kwargs)
 
+    def do_GET(self):
+        if self.path.startswith('/api/'):
+            self._api('GET')
+        else:
+            super().do_GET()
+
+    def send_head(self):
+        """Serve files with strong ETags, precompressed .br/.gz variants and cache headers"""
+        # The result store and graph caches live under <root>/.cache, which is never served
+        if hidden_path(self.path):
+            self.send_error(404)
+            return None
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            return super().send_head()
+
+        variants = [(coding, path + suffix) for coding, suffix in PRECOMPRESSED if os.path.isfile(path + suffix)]
+        accepted = accepted_encodings(self.headers.get('Accept-Encoding'))
+        encoding, served = next(((c, p) for c, p in variants if c in accepted), (None, path))
+        etag = file_etag(served)
+        cache_control = IMMUTABLE_CACHE if IMMUTABLE_NAME.search(path) else 'no-cache'
+
+        # Each encoding has its own bytes, hence its own ETag
+        if_none_match = [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]
+        if etag in if_none_match or '*' in if_none_match:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', cache_control)
+            if variants:
+                self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return None
+
+        f = open(served, 'rb')
+        self.send_response(200)
+        self.send_header('Content-Type', self.guess_type(path))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if variants:
+            self.send_header('Vary', 'Accept-Encoding')
+        stat = os.fstat(f.fileno())
+        self.send_header('Content-Length', str(stat.st_size))
+        self.send_header('Last-Modified', self.date_time_string(stat.st_mtime))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', cache_control)
+        self.end_headers()
+        return f
+
+    def do_POST(self):
+        if self.path.startswith('/api/'):
+            self._api('POST')
+        else:
+            self.send_error(405)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError(f"Request body larger than {MAX_BODY_BYTES} bytes")
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        if not isinstance(payload, dict):
+            raise ValueError("Request body must be a JSON object")
+        return payload
+
+    def _api(self, method):
+        """Route one API request to the service and map its errors to HTTP statuses"""
+        from service import ServiceBusy
+
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split('/') if p][1:]
+        query = parse_qs(url.query)
+        service = self.service
+        if service is None:
+            self._send_json(503, {'error': 'The simulation API is disabled'})
+            return
+
+        try:
+            wait = min(float(query.get('wait', [0])[0]), MAX_WAIT_SECONDS)
+            if method == 'GET' and parts == ['status']:
+                self._send_json(200, service.status())
+            elif method == 'GET' and parts == ['graphs']:
+                self._send_json(200, {'graphs': service.graphs()})
+            elif method == 'POST' and parts == ['graphs']:
+                self._send_json(200, service.load_graph(self._read_json().get('graph_ids')))
+            elif method == 'POST' and parts in (['simulations'], ['sweeps']):
+                submit = service.simulate if parts == ['simulations'] else service.sweep
+                job = submit(self._read_json())
+                if wait > 0:
+                    job = service.job(job['job'], wait)
+                self._send_json(200 if job['status'] in ('done', 'failed') else 202, job,
+                                {'Location': f"/api/jobs/{job['job']}"})
+            elif method == 'GET' and len(parts) == 2 and parts[0] == 'jobs':
+                job = service.job(parts[1], wait)
+                self._send_json(200 if job['status'] in ('done', 'failed') else 202, job)
+            else:
+                self._send_json(404, {'error': f"No API endpoint {method} {url.path}"})
+        except ServiceBusy as exc:
+            # Backpressure: the client should retry once queued jobs have drained
+            self._send_json(503, {'error': str(exc)}, {'Retry-After': '5'})
+        except KeyError as exc:
+            self._send_json(404, {'error': exc.args[0] if exc.args else str(exc)})
+        except (ValueError, TypeError) as exc:
+            self._send_json(400, {'error': str(exc)})
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve InfoDemics and its JSON simulation API")
+    parser.add_argument("--port", type=int, default=PORT, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=None, help="Simulation worker processes (default: all CPUs)")
+    parser.add_argument("--no-api", action="store_true", help="Serve static files only")
+    parser.add_argument("--no-browser", action="store_true", help="Do not open a browser")
+    return parser.parse_args()
+
 def start_server():
+    args = parse_args()
+    port = args.port
     print("=" * 70)
     print("🦠 InfoDemics - Starting Web Server")
     print("=" * 70)
     print(f"\nServer directory: {DIRECTORY}")
-    print(f"Server URL: http://localhost:{PORT}")
+    print(f"Server URL: http://localhost:{port}")
     print(f"\nOpening InfoDemics.html in your browser...")
     print("\n" + "=" * 70)
     print("INSTRUCTIONS:")
@@ -34,13 +206,23 @@ def start_server():
     print("\nTo stop the server: Press Ctrl+C")
     print("=" * 70 + "\n")
     
-    # Start server
-    with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
+    # Load the graph once and start the shared worker pool
+    if not args.no_api:
+        from service import default_service
+        MyHTTPRequestHandler.service = default_service(args.workers)
+        graph = MyHTTPRequestHandler.service.graphs()[0]
+        print(f"✅ Graph loaded: {graph['nodes']} nodes, {graph['edges']} edges")
+        print(f"✅ JSON API at http://localhost:{port}/api/status\n")
+    
+    # Start server (one thread per request; simulations run on the service's process pool)
+    with http.server.ThreadingHTTPServer(("", port), MyHTTPRequestHandler) as httpd:
         # Open browser
-        webbrowser.open(f"http://localhost:{PORT}/InfoDemics.html")
+        if not args.no_browser:
+            webbrowser.open(f"http://localhost:{port}/InfoDemics.html")
         
-        print(f"✅ Server running at http://localhost:{PORT}")
-        print(f"✅ Browser opened to InfoDemics.html\n")
+        print(f"✅ Server running at http://localhost:{port}")
+        if not args.no_browser:
+            print(f"✅ Browser opened to InfoDemics.html\n")
         
         try:
             httpd.serve_forever()
@@ -48,6 +230,9 @@ def start_server():
             print("\n\n" + "=" * 70)
             print("🛑 Server stopped. Thank you for using InfoDemics!")
             print("=" * 70)
+        finally:
+            if MyHTTPRequestHandler.service is not None:
+                MyHTTPRequestHandler.service.close()
 
 if __name__ == "__main__":
     start_server()
@@ -0,0 +1,197 @@
+"""
+InfoDemics - Parameter Sweep
+Fans SIR runs over a (beta, gamma, initial %, intervention) grid across a process pool
+"""
+
+import hashlib
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import scipy.sparse as sp
+
+from sir_engine import graph_to_csr, initial_state_matrix, run_sir_ensemble, seed_sequence
+from result_store import graph_hash, result_key
+
+
+class SharedGraph:
+    """CSR adjacency and per-node columns copied once into shared memory"""
+
+    def __init__(self, arrays):
+        self._blocks = []
+        self.spec = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self._blocks.append(block)
+            self.spec[name] = (block.name, array.shape, array.dtype.str)
+
+    @classmethod
+    def from_graph(cls, G):
+        """Share the adjacency, seeding masks and degrees of a graph built by create_network_graph"""
+        adjacency, nodes = graph_to_csr(G)
+        labels = np.array([G.nodes[n]['label'] for n in nodes])
+        return cls({
+            'indptr': adjacency.indptr,
+            'indices': adjacency.indices,
+            'data': adjacency.data,
+            'seed_mask': labels == 'Conspiracy',
+            'candidate_mask': labels == 'Non-Conspiracy',
+            'degree': np.array([G.nodes[n]['degree'] for n in nodes], dtype=np.float64),
+        })
+
+    def close(self):
+        """Release and unlink the shared blocks"""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Per-worker state, set up once by init_worker (or switched by attach_graph)
+_worker_blocks = []
+_worker_arrays = {}
+_worker_views = {}
+_worker_spec = None
+
+
+def init_worker(spec):
+    """Attach a worker process to the shared graph arrays (no copy)"""
+    global _worker_spec
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _worker_blocks.append(block)
+        _worker_arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    _worker_spec = spec
+
+
+def attach_graph(spec):
+    """Point a long-lived worker at another shared graph (no-op if it is already attached)"""
+    if spec == _worker_spec:
+        return
+    _worker_arrays.clear()
+    _worker_views.clear()
+    for block in _worker_blocks:
+        block.close()
+    _worker_blocks.clear()
+    init_worker(spec)
+
+
+def graph_view(remove_superspreaders, superspreader_pct):
+    """Adjacency and seeding masks for one intervention setting, cached per worker"""
+    key = (remove_superspreaders, superspreader_pct)
+    if key not in _worker_views:
+        arrays = _worker_arrays
+        n_nodes = len(arrays['indptr']) - 1
+        adjacency = sp.csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']), shape=(n_nodes, n_nodes))
+        seed_mask, candidate_mask = arrays['seed_mask'], arrays['candidate_mask']
+
+        # Same rule as create_network_graph: drop nodes above the degree percentile
+        if remove_superspreaders:
+            threshold = np.percentile(arrays['degree'], 100 - superspreader_pct)
+            keep = arrays['degree'] <= threshold
+            adjacency = adjacency[keep][:, keep]
+            seed_mask, candidate_mask = seed_mask[keep], candidate_mask[keep]
+
+        _worker_views[key] = (adjacency, seed_mask, candidate_mask)
+    return _worker_views[key]
+
+
+def run_point(point, time_steps, replicates, superspreader_pct, seed):
+    """Simulate one grid point inside a worker (seed is the point's own SeedSequence)"""
+    beta, gamma, initial_infected_pct, remove_superspreaders = point
+    adjacency, seed_mask, candidate_mask = graph_view(remove_superspreaders, superspreader_pct)
+    n_nodes = adjacency.shape[0]
+
+    total_infected = int(n_nodes * initial_infected_pct / 100)
+    initial_states = initial_state_matrix(seed_mask, candidate_mask, total_infected, replicates, seed)
+    sir_history, ensemble_stats, _ = run_sir_ensemble(adjacency, initial_states, beta, gamma, time_steps, seed=seed)
+
+    return point, {
+        'nodes': n_nodes,
+        'final_size': n_nodes - sir_history['S'][-1],
+        'peak_infected': float(ensemble_stats['peak_infected'].mean()),
+        'peak_time': float(np.median(ensemble_stats['peak_time'])),
+    }
+
+
+def plain_point(point):
+    """Grid point with numpy scalars turned into Python values (np.float64(0.1) -> 0.1)"""
+    return tuple(value.item() if isinstance(value, np.generic) else value for value in point)
+
+
+def point_seed(seed, point):
+    """Seed of one grid point, derived from its values rather than its position in the grid
+
+    Values are hashed as plain Python numbers, so the app's numpy grid and
+    the float grids of the API and batch runner share their random streams.
+    """
+    digest = hashlib.blake2b(repr(plain_point(point)).encode(), digest_size=8).digest()
+    return seed_sequence(seed, int.from_bytes(digest, 'little'))
+
+
+def sweep_key(content_hash, point, time_steps, replicates, superspreader_pct, seed):
+    """Result store key of one grid point"""
+    return result_key(content_hash, {
+        'kind': 'sweep', 'point': list(plain_point(point)), 'time_steps': time_steps,
+        'replicates': replicates, 'superspreader_pct': superspreader_pct
+    }, seed)
+
+
+def parameter_grid(betas, gammas, initial_infected_pcts, remove_options=(False,)):
+    """All (beta, gamma, initial_infected_pct, remove_superspreaders) combinations"""
+    return list(itertools.product(betas, gammas, initial_infected_pcts, remove_options))
+
+
+def run_sweep(G, grid, time_steps=50, replicates=1, superspreader_pct=1, max_workers=None, seed=None,
+              store=None):
+    """Run every grid point on a process pool, yielding (point, result) as runs finish
+
+    The adjacency is placed in shared memory once and attached by each worker
+    at start-up, so tasks only carry the four grid values. Each point draws
+    from a stream derived from `seed` and its own values, so results do not
+    depend on the number of workers or on the rest of the grid. With a
+    ResultStore and a seed, stored points are yielded first and skipped.
+    """
+    keys = {}
+    pending = list(grid)
+    if store is not None and seed is not None:
+        content_hash = graph_hash(G)
+        keys = {
+            point: sweep_key(content_hash, point, time_steps, replicates, superspreader_pct, seed)
+            for point in grid
+        }
+        stored = store.contains(keys.values())
+        pending = [point for point in grid if keys[point] not in stored]
+        for point in grid:
+            if keys[point] in stored:
+                yield point, store.get(keys[point])
+    if not pending:
+        return
+
+    max_workers = max_workers or os.cpu_count()
+    with SharedGraph.from_graph(G) as shared:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(shared.spec,)) as pool:
+            futures = [
+                pool.submit(run_point, point, time_steps, replicates, superspreader_pct, point_seed(seed, point))
+                for point in pending
+            ]
+            try:
+                for future in as_completed(futures):
+                    point, result = future.result()
+                    if keys:
+                        store.put(keys[point], {'kind': 'sweep', 'point': list(point)}, result)
+                    yield point, result
+            finally:
+                # Drop queued points if the caller stops early
+                for future in futures:
+                    future.cancel()
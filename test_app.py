@@ -2,6 +2,12 @@
 Test script to verify the InfoDemics application logic without Streamlit
 """
 import sys
+import os
+
+# Shared loader and engine modules live in apps/
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(PROJECT_DIR, 'data')
+sys.path.insert(0, os.path.join(PROJECT_DIR, 'apps'))
 
 print("Testing InfoDemics Application Components...")
 print("=" * 60)
@@ -16,13 +22,12 @@ else:
 
 # Test 2: Check if CSV files exist
 print("\n2. Checking CSV files...")
-import os
-if os.path.exists('nodes.csv'):
+if os.path.exists(os.path.join(DATA_DIR, 'nodes.csv')):
     print("   ✓ nodes.csv found")
 else:
     print("   ❌ nodes.csv NOT found")
 
-if os.path.exists('edges.csv'):
+if os.path.exists(os.path.join(DATA_DIR, 'edges.csv')):
     print("   ✓ edges.csv found")
 else:
     print("   ❌ edges.csv NOT found")
@@ -33,9 +38,11 @@ required_packages = {
     'pandas': 'Data manipulation',
     'numpy': 'Numerical computations',
     'networkx': 'Graph algorithms',
+    'scipy': 'Sparse matrices',
     'streamlit': 'Web framework',
     'pyvis': 'Network visualization',
-    'plotly': 'Interactive charts'
+    'plotly': 'Interactive charts',
+    'pyarrow': 'Parquet ingest'
 }
 
 missing_packages = []
@@ -51,9 +58,8 @@ for package, description in required_packages.items():
 if 'pandas' not in missing_packages:
     print("\n4. Testing data loading...")
     try:
-        import pandas as pd
-        nodes_df = pd.read_csv('nodes.csv')
-        edges_df = pd.read_csv('edges.csv')
+        from data_loader import load_network_data
+        nodes_df, edges_df = load_network_data(DATA_DIR)
         print(f"   ✓ Loaded {len(nodes_df)} nodes")
         print(f"   ✓ Loaded {len(edges_df)} edges")
         print(f"   ✓ Node columns: {list(nodes_df.columns)}")
@@ -66,11 +72,8 @@ if 'networkx' not in missing_packages and 'pandas' not in missing_packages:
     print("\n5. Testing graph creation...")
     try:
         import networkx as nx
-        G = nx.Graph()
-        G.add_nodes_from(nodes_df['id'])
-        for _, edge in edges_df.iterrows():
-            if edge['source'] in nodes_df['id'].values and edge['target'] in nodes_df['id'].values:
-                G.add_edge(edge['source'], edge['target'])
+        from data_loader import build_graph
+        G = build_graph(nodes_df, edges_df)
         print(f"   ✓ Created graph with {G.number_of_nodes()} nodes")
         print(f"   ✓ Graph has {G.number_of_edges()} edges")
         print(f"   ✓ Graph is connected: {nx.is_connected(G)}")
@@ -81,6 +84,160 @@ if 'networkx' not in missing_packages and 'pandas' not in missing_packages:
     except Exception as e:
         print(f"   ❌ Error creating graph: {e}")
 
+# Test 6: CSR SIR engine against its own counters and the original per-node loop
+if not {'numpy', 'networkx', 'scipy'} & set(missing_packages):
+    print("\n6. Testing CSR SIR engine...")
+    try:
+        import numpy as np
+        import networkx as nx
+        from sir_engine import INFECTED, graph_to_csr, sir_csr_steps
+
+        def reference_sir(G, states, beta, gamma, time_steps, rng):
+            """The original dict-based per-node SIR loop, returning the I curve"""
+            curve = []
+            for t in range(time_steps):
+                curve.append(sum(1 for s in states.values() if s == 'I'))
+                new_states = states.copy()
+                for node in G.nodes():
+                    if states[node] == 'S':
+                        infected_neighbors = [n for n in G.neighbors(node) if states[n] == 'I']
+                        if infected_neighbors and rng.random() < 1 - (1 - beta) ** len(infected_neighbors):
+                            new_states[node] = 'I'
+                for node in G.nodes():
+                    if states[node] == 'I' and rng.random() < gamma:
+                        new_states[node] = 'R'
+                states = new_states
+            return curve
+
+        G_test = nx.barabasi_albert_graph(300, 2, seed=7)
+        adjacency, node_order = graph_to_csr(G_test)
+        beta, gamma, time_steps, replicates = 0.1, 0.2, 25, 200
+        rng = np.random.default_rng(7)
+        seeds = [rng.choice(len(node_order), 10, replace=False) for _ in range(replicates)]
+
+        mismatched_steps = 0
+        csr_curves, reference_curves = [], []
+        for r, seed_nodes in enumerate(seeds):
+            state = np.zeros(len(node_order), dtype=np.int8)
+            state[seed_nodes] = INFECTED
+            curve = []
+            for snapshot, current in sir_csr_steps(adjacency, state, beta, gamma, time_steps, seed=r):
+                counts = np.bincount(current, minlength=3)[:3]
+                mismatched_steps += (snapshot['S'], snapshot['I'], snapshot['R']) != tuple(counts)
+                curve.append(snapshot['I'])
+            csr_curves.append(curve)
+
+            states = {node: 'S' for node in node_order}
+            states.update({node_order[i]: 'I' for i in seed_nodes})
+            reference_curves.append(reference_sir(G_test, states, beta, gamma, time_steps, rng))
+
+        if mismatched_steps:
+            print(f"   ❌ S/I/R counters disagree with the states on {mismatched_steps} steps")
+        else:
+            print(f"   ✓ S/I/R counters match the states on all {replicates * time_steps} steps")
+
+        # Mean I curves of independent ensembles agree within a few standard errors
+        csr_curves, reference_curves = np.array(csr_curves), np.array(reference_curves)
+        difference = np.abs(csr_curves.mean(axis=0) - reference_curves.mean(axis=0))
+        standard_error = np.sqrt((csr_curves.var(axis=0) + reference_curves.var(axis=0)) / replicates)
+        if np.all(difference <= 4 * standard_error + 0.5):
+            print(f"   ✓ Mean I curve matches the per-node loop (max difference {difference.max():.2f} nodes)")
+        else:
+            print(f"   ❌ Mean I curve differs from the per-node loop by up to {difference.max():.2f} nodes")
+    except Exception as e:
+        print(f"   ❌ Error running the SIR engine: {e}")
+
+# Test 7: adaptive interventions keep their S/I/R counters in step with the states
+if not {'numpy', 'networkx', 'scipy'} & set(missing_packages):
+    print("\n7. Testing adaptive intervention policies...")
+    try:
+        import numpy as np
+        import networkx as nx
+        from sir_engine import INFECTED, graph_to_csr
+        from intervention import AtRiskImmunizationPolicy, InfectedPriorityPolicy, adaptive_steps
+
+        G_test = nx.barabasi_albert_graph(3000, 3, seed=11)
+        adjacency, node_order = graph_to_csr(G_test)
+        degree = np.diff(adjacency.indptr)
+        initial = np.zeros(len(node_order), dtype=np.int8)
+        initial[np.random.default_rng(11).choice(len(node_order), 30, replace=False)] = INFECTED
+
+        policies = {
+            'InfectedPriorityPolicy': InfectedPriorityPolicy(degree),
+            'AtRiskImmunizationPolicy': AtRiskImmunizationPolicy(adjacency, degree),
+        }
+        for name, policy in policies.items():
+            mismatched_steps, controlled = 0, []
+            for snapshot, state in adaptive_steps(adjacency, initial, 0.2, 0.1, policy, budget=20, seed=11):
+                counts = np.bincount(state, minlength=3)[:3]
+                mismatched_steps += (snapshot['S'], snapshot['I'], snapshot['R']) != tuple(counts)
+                controlled.append(snapshot['controlled'])
+            if mismatched_steps:
+                print(f"   ❌ {name}: S/I/R counters disagree with the states on {mismatched_steps} steps")
+            elif controlled[-1] > 20 * (len(controlled) - 1) or np.any(np.diff(controlled) > 20):
+                print(f"   ❌ {name}: more nodes controlled than the budget allows")
+            else:
+                print(f"   ✓ {name}: counters match the states, {controlled[-1]} nodes controlled")
+    except Exception as e:
+        print(f"   ❌ Error running adaptive interventions: {e}")
+
+# Test 8: the SEIR branch of the event-driven engine keeps S+E+I+R in step with the states
+if not {'numpy', 'networkx', 'scipy'} & set(missing_packages):
+    print("\n8. Testing event-driven SEIR model...")
+    try:
+        import numpy as np
+        import networkx as nx
+        from sir_engine import INFECTED, graph_to_csr
+        from event_engine import event_driven_steps
+
+        G_test = nx.barabasi_albert_graph(2000, 3, seed=13)
+        adjacency, node_order = graph_to_csr(G_test)
+        initial = np.zeros(len(node_order), dtype=np.int8)
+        initial[np.random.default_rng(13).choice(len(node_order), 20, replace=False)] = INFECTED
+
+        mismatched_steps, exposed = 0, []
+        for snapshot, state in event_driven_steps(adjacency, initial, 0.2, 0.1, 50, 'SEIR', 0.2, seed=13):
+            counts = np.bincount(state, minlength=4)
+            mismatched_steps += (snapshot['S'], snapshot['I'], snapshot['R'], snapshot['E']) != tuple(counts)
+            mismatched_steps += sum(counts) != len(node_order)
+            exposed.append(snapshot['E'])
+        if mismatched_steps:
+            print(f"   ❌ S/E/I/R counters disagree with the states on {mismatched_steps} steps")
+        elif max(exposed) == 0:
+            print("   ❌ No node ever entered the Exposed stage")
+        else:
+            print(f"   ✓ S/E/I/R counters match the states, up to {max(exposed)} nodes exposed")
+    except Exception as e:
+        print(f"   ❌ Error running the SEIR model: {e}")
+
+# Test 9: synthetic graphs keep within-label edges when a label block is empty
+if not {'numpy', 'pandas', 'pyarrow'} & set(missing_packages):
+    print("\n9. Testing synthetic graph generator...")
+    try:
+        import tempfile
+        import pandas as pd
+        from graph_generator import generate_graph, profile_from_data
+
+        profile = profile_from_data(DATA_DIR, seed=0)
+        labels = list(profile['labels'])
+        # The first label gets no nodes, so its block is empty
+        profile['labels'] = {label: (0.0 if i == 0 else 1.0 / (len(labels) - 1)) for i, label in enumerate(labels)}
+        profile['same_label_edges'] = 1.0
+        with tempfile.TemporaryDirectory() as out_dir:
+            generate_graph(profile, 2000, out_dir, seed=0)
+            nodes = pd.read_csv(os.path.join(out_dir, 'nodes.csv'))
+            edges = pd.read_csv(os.path.join(out_dir, 'edges.csv'))
+        label_of = nodes.set_index('id')['label']
+        same_label = (label_of.reindex(edges['source']).to_numpy() == label_of.reindex(edges['target']).to_numpy()).mean()
+        if (nodes['label'] == labels[0]).any():
+            print(f"   ❌ Nodes generated for the empty label {labels[0]}")
+        elif same_label < 1.0:
+            print(f"   ❌ Only {same_label:.1%} of edges stay within one label (expected 100%)")
+        else:
+            print(f"   ✓ {len(edges)} edges all within one label, none for the empty label")
+    except Exception as e:
+        print(f"   ❌ Error generating a synthetic graph: {e}")
+
 # Summary
 print("\n" + "=" * 60)
 if missing_packages: